@@ -1,139 +1,284 @@
+import time
+LAUNCH_TIME = time.perf_counter()
 import sys
 import os
-import cv2
-import mediapipe as mp
-import mido
-import time
-import numpy as np
-import collections
+import dataclasses
+import importlib
 import logging
+import multiprocessing
+import threading
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton, QTextEdit, QSlider, QSizePolicy, QSpacerItem
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QPoint
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QPoint, QTimer, QEvent
 from PyQt5.QtGui import QPalette, QColor, QImage, QPixmap, QIcon, QBrush
+# Only lightweight modules here; cv2, numpy, mediapipe and mido load after the window is shown
+from madhand.channels import ALL_CHANNELS, voice_masks
+from madhand.eventlog import EventLog, DEBUG, INFO, WARNING
+from madhand.devices import CAMERA_LOCK, camera_label, load_camera_cache
+from madhand.live import LiveValue
+from madhand.warm import WarmEngine
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 script_dir = os.path.dirname(os.path.realpath(__file__))
 
 class VideoThread(QThread):
-    update_frame = pyqtSignal(QImage)
-    update_log = pyqtSignal(str)
+    # Preview image and the index of the renderer buffer it wraps, to be released once shown
+    update_frame = pyqtSignal(QImage, int)
 
-    def __init__(self, params):
+    def __init__(self, params, events, preview, warm):
         super().__init__()
         self.params = params
+        self.events = events
+        self.preview = preview
+        self.warm = warm
+        self.metrics = None
         self.running = False
+        self.dispatcher = None
+        self.midi_recorder = None
+        self._recording_lock = threading.Lock()
+
+    def record_midi(self, on):
+        """Start or stop recording the MIDI output to a new file; safe to call from the UI thread."""
+        from madhand.midifile import MidiRecorder
+
+        with self._recording_lock:
+            if on and self.midi_recorder is None and self.dispatcher is not None:
+                recordings_dir = os.path.join(script_dir, 'recordings')
+                os.makedirs(recordings_dir, exist_ok=True)
+                path = os.path.join(recordings_dir, time.strftime('session-%Y%m%d-%H%M%S.mid'))
+                self.midi_recorder = MidiRecorder(path).start()
+                self.dispatcher.recorder = self.midi_recorder
+                self.events.info('recording', "Recording MIDI to {}", path)
+            elif not on and self.midi_recorder is not None:
+                if self.dispatcher is not None:
+                    self.dispatcher.recorder = None
+                recorder, self.midi_recorder = self.midi_recorder, None
+                recorder.stop()
+                self.events.info('recording', "Recorded {} MIDI messages ({:.0f} s) to {}{}", recorder.recorded,
+                                 recorder.duration(), recorder.path,
+                                 ", {} dropped".format(recorder.dropped) if recorder.dropped else "")
 
     def run(self):
-        # Initialize MIDI output
+        # Usually already imported by the warm-up thread, so these are cheap
+        from madhand.capture import FrameGrabber, LatencyStats
+        from madhand.sources import CaptureFormat, create_source
+        from madhand.preprocess import FramePreprocessor
+        from madhand.midi import MidiDispatcher
+        from madhand.engine import NoteEngine
+        from madhand.inference import SolutionsBackend, TasksBackend
+        from madhand.idle import IdleScheduler
+        from madhand.recording import LandmarkRecorder
+        from madhand.parallel import ParallelInference
+        from madhand.metrics import Metrics, MetricsExporter, NullMetrics
+
+        # The MIDI port stays open between runs
         try:
-            self.midi_port = mido.open_output(self.params['midi_port'])
-            self.update_log.emit(f"Connected to MIDI port: {self.params['midi_port']}")
+            midi_port = self.warm.midi_port(self.params['midi_port'])
+            self.events.info('midi', "Connected to MIDI port: {}", self.params['midi_port'])
         except Exception as e:
-            self.update_log.emit(f"Error initializing MIDI: {e}")
+            self.events.error('midi', "Error initializing MIDI: {}", e)
             return
 
-        # Initialize MediaPipe Hands
-        mp_hands = mp.solutions.hands
-        hands = mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
-        mp_drawing = mp.solutions.drawing_utils
-
-        # Initialize webcam
-        cap = cv2.VideoCapture(self.params['camera_index'])
-        if not cap.isOpened():
-            self.update_log.emit("Error: Could not open webcam.")
+        # Hand tracking backend: the Tasks landmarker on its own thread, worker processes, or
+        # MediaPipe Hands in this thread (built once per hand count and reused across runs)
+        max_num_hands = self.params['max_num_hands']
+        if self.params['inference'] == 'tasks':
+            try:
+                backend = TasksBackend(self.params['tasks_model'], max_num_hands)
+            except Exception as e:
+                self.events.error('inference', "Error loading {}: {}", self.params['tasks_model'], e)
+                return
+        elif self.params.get('inference_workers', 1) > 1:
+            backend = ParallelInference(self.params['inference_workers'], max_num_hands=max_num_hands)
+        else:
+            backend = SolutionsBackend(self.warm.hands(max_num_hands))
+
+        # Initialize webcam on its own capture thread, asking for the chosen format and a one-frame driver buffer
+        width, height = self.params['capture_size'] or (None, None)
+        requested = CaptureFormat(width, height, self.params['capture_fps'], self.params['pixel_format'], buffer_size=1)
+        source = create_source(self.params['camera_index'], requested)
+        grabber = FrameGrabber(source)
+        with CAMERA_LOCK:
+            opened = grabber.open()
+        if not opened:
+            self.events.error('camera', "Error: Could not open webcam.")
+            backend.close()
             return
-
-        # Set higher frame rate if supported
-        cap.set(cv2.CAP_PROP_FPS, 60)
-
-        # Initialize history for smoothing
-        note_history = collections.deque(maxlen=self.params['smoothing_window'])
-        velocity_history = collections.deque(maxlen=self.params['smoothing_window'])
-
-        def hand_to_midi(hand_landmarks):
-            raw_note = int(np.interp(hand_landmarks.landmark[8].y, [0, 1], [self.params['max_note'], self.params['min_note']]))
-            raw_velocity = int(np.interp(hand_landmarks.landmark[4].y, [0, 1], [127, 30]))
-            
-            note_history.append(raw_note)
-            velocity_history.append(raw_velocity)
-            
-            note = int(sum(note_history) / len(note_history))
-            velocity = int(sum(velocity_history) / len(velocity_history))
-            
-            return note, velocity
-
-        def is_fist(hand_landmarks):
-            return all(hand_landmarks.landmark[tip].y > hand_landmarks.landmark[mid].y 
-                       for tip, mid in [(8,6), (12,10), (16,14), (20,18)])
-
-        last_note = None
-        last_time = time.time()
-        hold_note = False
+        self.events.info('camera', "Camera granted {} (asked for {})", source.granted.describe(), requested.describe())
+        for name, asked, granted in source.mismatches():
+            self.events.warning('camera', "Camera did not grant {} {}, got {}", name, asked, granted)
+        self.events.info('startup', "Camera open {:.0f} ms after RUN", (time.perf_counter() - self.params['run_time']) * 1000)
+        latency = LatencyStats()
+        last_report = time.time()
+        # Stage timings for the overlay and the export file; a no-op stand-in when off
+        metrics = self.metrics = Metrics() if self.params['metrics'] else NullMetrics()
+        exporter = None
+        if metrics.enabled and self.params.get('metrics_path'):
+            exporter = MetricsExporter(metrics, self.params['metrics_path'])
+            self.events.info('metrics', "Exporting metrics to {}", self.params['metrics_path'])
+        last_roll = time.perf_counter()
+        overlay = []
+        dispatcher = self.dispatcher = MidiDispatcher(midi_port, self.params['channel_mask'], metrics).start()
+        # The recorder is fed from the MIDI thread and writes from its own, so recording never touches this loop
+        if self.params.get('record_midi'):
+            self.record_midi(True)
+        # The preview is tinted after downscaling, so only the flipped frame is needed here
+        preprocessor = FramePreprocessor(tint=False)
+
+        # Settings the window may swap while running; picked up at the start of the next frame
+        live_config = self.params['config']
+        live_rate = self.params['inference_rate']
+        config_version, config = live_config.snapshot()
+        engine = NoteEngine(config, dispatcher, self.events, self.params['voice_masks'])
+
+        recorder = None
+        if self.params.get('record_landmarks'):
+            recordings_dir = os.path.join(script_dir, 'recordings')
+            os.makedirs(recordings_dir, exist_ok=True)
+            path = os.path.join(recordings_dir, time.strftime('landmarks-%Y%m%d-%H%M%S.mhl'))
+            recorder = LandmarkRecorder(path, self.params['max_num_hands'])
+            self.events.info('recording', "Recording landmarks to {}", path)
+
+        # Frames between inference runs are filled in from the filter's prediction
+        inference_interval = 1.0 / live_rate.get()
+        last_inference = 0.0
+        # With no hand in view, tracking drops to a low duty cycle until a frame difference shows motion
+        idle = IdleScheduler() if self.params['idle'] else None
+        detected = []
+        first_note = True
 
         self.running = True
         while self.running:
-            success, image = cap.read()
-            if not success:
-                self.update_log.emit("Ignoring empty camera frame.")
+            frame = grabber.read()
+            if frame is None:
+                if grabber.finished:
+                    break
                 continue
-
-            image = cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB)
-            results = hands.process(image)
-
-            # Apply green tint
-            green_tinted = image.copy()
-            green_tinted[:,:,0] = image[:,:,0] * 0.5  # Reduce red channel
-            green_tinted[:,:,2] = image[:,:,2] * 0.5  # Reduce blue channel
-            green_tinted[:,:,1] = np.clip(image[:,:,1] * 1.2, 0, 255)  # Boost green channel
-
-            image = cv2.cvtColor(green_tinted, cv2.COLOR_RGB2BGR)
-
-            if results.multi_hand_landmarks:
-                for hand_landmarks in results.multi_hand_landmarks:
-                    mp_drawing.draw_landmarks(image, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-
-                    fist = is_fist(hand_landmarks)
-                    if fist:
-                        hold_note = True
-                        self.update_log.emit("Fist detected, holding note")
-                    else:
-                        hold_note = False
-                        self.update_log.emit("Hand open, ready to change note")
-
-                    note, velocity = hand_to_midi(hand_landmarks)
-                    self.update_log.emit(f"Smoothed note: {note}, velocity: {velocity}")
-
-                    if not hold_note and (last_note is None or abs(note - last_note) >= self.params['note_change_threshold']):
-                        if last_note is not None:
-                            for channel in range(16):
-                                self.midi_port.send(mido.Message('note_off', note=last_note, channel=channel))
-                                self.update_log.emit(f"Sent Note Off: {last_note} on channel {channel}")
-                        for channel in range(16):
-                            self.midi_port.send(mido.Message('note_on', note=note, velocity=velocity, channel=channel))
-                            self.update_log.emit(f"Sent Note On: {note}, Velocity: {velocity} on channel {channel}")
-                        last_note = note
-                        last_time = time.time()
-
-            elif last_note is not None and time.time() - last_time > 0.1:
-                for channel in range(16):
-                    self.midi_port.send(mido.Message('note_off', note=last_note, channel=channel))
-                    self.update_log.emit(f"Sent Note Off (no hand): {last_note} on channel {channel}")
-                last_note = None
-
-            h, w, ch = image.shape
-            bytes_per_line = ch * w
-            convert_to_qt_format = QImage(image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            p = convert_to_qt_format.scaled(640, 360, Qt.KeepAspectRatio)
-            self.update_frame.emit(p)
-
-        cap.release()
-        self.midi_port.close()
+            # Time from capture to pickup by this loop
+            metrics.record('capture', frame.timestamp)
+            metrics.frame(grabber.dropped)
+
+            version, config = live_config.snapshot()
+            if version != config_version:
+                config_version = version
+                try:
+                    engine.configure(config)
+                except ValueError as e:
+                    # Keep playing with the settings already in use
+                    self.events.error('config', "Settings not applied: {}", e)
+                else:
+                    self.events.info('config', "Settings updated: notes {}-{} in {} on {}, cutoff {:g} Hz, beta {:g}, "
+                                     "threshold {}, hysteresis {:g}", config.min_note, config.max_note, config.scale,
+                                     config.root, config.filter_min_cutoff, config.filter_beta,
+                                     config.note_change_threshold, config.hysteresis)
+            inference_interval = 1.0 / live_rate.get()
+
+            # Flip, convert and green-tint into reused buffers
+            start = metrics.clock()
+            rgb, image = preprocessor.process(frame.image)
+            metrics.record('preprocess', start)
+
+            # (capture time, hands) for every inference result ready this frame
+            start = metrics.clock()
+            due = frame.timestamp - last_inference >= inference_interval * 0.75
+            if due and (idle is None or idle.should_infer(rgb, frame.timestamp)) and backend.submit(rgb, frame.timestamp):
+                last_inference = frame.timestamp
+            try:
+                results = backend.poll()
+            except RuntimeError as e:
+                self.events.error('inference', "Hand tracking stopped: {}", e)
+                break
+            if results:
+                metrics.record('inference', start)
+
+            start = metrics.clock()
+            started = False
+            for timestamp, detected in results:
+                if idle is not None:
+                    idle.update(detected, timestamp)
+                if recorder is not None:
+                    recorder.write(timestamp, detected)
+                if engine.process(detected, timestamp):
+                    latency.record(timestamp)
+                    started = True
+            if not results and engine.tick(frame.timestamp):
+                latency.record(frame.timestamp)
+                started = True
+            metrics.record('engine', start)
+            if started and first_note:
+                first_note = False
+                self.events.info('startup', "First note {:.0f} ms after RUN", (time.perf_counter() - self.params['run_time']) * 1000)
+
+            start = metrics.clock()
+            rendered = self.preview.render(image, detected, frame.timestamp, overlay)
+            if rendered is not None:
+                metrics.record('preview', start)
+                index, buffer = rendered
+                h, w, ch = buffer.shape
+                bytes_per_line = ch * w
+                # Wraps the renderer's buffer without copying; it stays reserved until update_video releases it
+                self.update_frame.emit(QImage(buffer.data, w, h, bytes_per_line, QImage.Format_RGB888), index)
+
+            if metrics.enabled and frame.timestamp - last_roll >= 1.0:
+                last_roll = frame.timestamp
+                metrics.roll()
+                overlay = metrics.overlay_lines()
+                if exporter is not None:
+                    exporter.maybe_export()
+
+            if time.time() - last_report > 5:
+                self.events.info('stats', latency.summary(grabber))
+                self.events.info('stats', "Events: {}", self.events.summary())
+                if idle is not None:
+                    self.events.info('stats', idle.summary())
+                last_report = time.time()
+
+        grabber.close()
+        backend.close()
+        if idle is not None:
+            self.events.info('stats', idle.summary())
+        if backend.dropped:
+            self.events.info('stats', "Inference skipped {} of {} frames", backend.dropped, backend.submitted)
+        if recorder is not None:
+            recorder.close()
+            self.events.info('recording', "Recorded {} frames of landmarks", recorder.frames)
+        engine.release()
+        dispatcher.stop()
+        # After the final note offs, which belong in the recording
+        self.record_midi(False)
+        self.dispatcher = None
+        if exporter is not None:
+            exporter.export()
+        self.events.info('stats', latency.summary(grabber))
+        self.events.info('stats', "MIDI: {} messages sent, {} redundant events coalesced", dispatcher.sent, dispatcher.coalesced)
 
     def stop(self):
         self.running = False
         self.wait()
 
+class WarmupThread(QThread):
+    """Loads the heavy modules, lists MIDI ports, prewarms the model and probes cameras."""
+    midi_ports_found = pyqtSignal(list)
+    model_ready = pyqtSignal(float)
+    cameras_found = pyqtSignal(list)
+
+    def __init__(self, warm, max_num_hands):
+        super().__init__()
+        self.warm = warm
+        self.max_num_hands = max_num_hands
+
+    def run(self):
+        from madhand.devices import midi_output_names, probe_cameras, save_camera_cache
+
+        self.midi_ports_found.emit(midi_output_names())
+        self.model_ready.emit(self.warm.prewarm(self.max_num_hands))
+        # Modules the first run would otherwise import
+        for name in ('capture', 'preprocess', 'preview', 'midi', 'engine'):
+            importlib.import_module(f'madhand.{name}')
+        cameras = probe_cameras()
+        save_camera_cache(cameras)
+        self.cameras_found.emit(cameras)
+
 class CustomTitleBar(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -216,8 +361,32 @@ class CustomTitleBar(QWidget):
 
 
 class MainWindow(QMainWindow):
+    LOG_LEVELS = {"Info": INFO, "Debug": DEBUG, "Warning": WARNING}
+    LOG_FLUSH_INTERVAL_MS = 100
+    LOG_MAX_LINES = 1000
+    # Combo entry: (metrics on, export file name)
+    METRICS_MODES = {"Off": (False, None), "Overlay": (True, None),
+                     "Overlay + CSV": (True, "metrics.csv"), "Overlay + Prometheus": (True, "madhand.prom")}
+    LIVE_SLIDERS = ("Min Note", "Max Note", "Filter Cutoff", "Filter Beta", "Note Change Threshold", "Hysteresis",
+                    "CC Number", "Inference Rate")
+    INFERENCE_MODES = {"Full Frame": 'full', "Tasks Live Stream": 'tasks'}
+    LIVE_COMBOS = ("Scale", "Root", "Pitch Bend", "CC Source")
+    # Requested camera format; "Auto" leaves it to the driver
+    CAPTURE_SIZES = {"Auto": None, "640x480": (640, 480), "1280x720": (1280, 720), "1920x1080": (1920, 1080)}
+    CAPTURE_RATES = ("60", "30", "120")
+    PIXEL_FORMATS = ("MJPG", "YUYV", "Auto")
+    CONTROLLER_SOURCES = ('index_x', 'hand_x', 'hand_y', 'pinch')
+    # Kept in step with madhand.mapping, which is only imported once processing starts
+    SCALES = ('chromatic', 'major', 'minor', 'harmonic_minor', 'dorian', 'pentatonic', 'minor_pentatonic', 'blues')
+    NOTE_NAMES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+
     def __init__(self):
         super().__init__()
+        self.events = EventLog()
+        self.warm = WarmEngine()
+        # Created on the first run, and owned by the window so its buffers outlive any queued
+        # preview frames of a stopped thread
+        self.preview = None
         self.setWindowTitle("MadHand")
         
         # Remove default title bar
@@ -269,6 +438,10 @@ class MainWindow(QMainWindow):
                 color: #ffffff; 
                 border: 2px solid #FF00FF;
             }
+            QPushButton:checked { 
+                background-color: rgba(255, 0, 64, 0.7);
+                color: #ffffff; 
+            }
             QTextEdit { 
                 background-color: rgba(0, 0, 0, 0.5);
                 color: #00FFCA; 
@@ -302,27 +475,89 @@ class MainWindow(QMainWindow):
         """)
         layout.addWidget(title_label)
 
-        # MIDI Input Selection
-        midi_ports = mido.get_output_names()
-        midi_layout = self.create_labeled_combo("MIDI Output", midi_ports if midi_ports else ["No MIDI ports available"])
+        # MIDI Input Selection, filled in by the warm-up thread
+        midi_layout = self.create_labeled_combo("MIDI Output", ["Searching for MIDI ports..."])
         layout.addLayout(midi_layout)
 
-        # Camera Selection
-        camera_layout = self.create_labeled_combo("Webcam", [f"Camera {i}" for i in range(5)])
+        # Camera Selection, from the last probe until the warm-up thread has found the current cameras
+        camera_layout = self.create_labeled_combo("Webcam", [])
         layout.addLayout(camera_layout)
-
+        self.set_cameras(load_camera_cache() or [{'index': i} for i in range(5)])
+        # Compressed MJPG is what lets most webcams run above 30 fps at larger sizes
+        capture_layout = QHBoxLayout()
+        capture_layout.addLayout(self.create_labeled_combo("Resolution", list(self.CAPTURE_SIZES)))
+        capture_layout.addLayout(self.create_labeled_combo("Camera FPS", list(self.CAPTURE_RATES)))
+        capture_layout.addLayout(self.create_labeled_combo("Pixel Format", list(self.PIXEL_FORMATS)))
+        layout.addLayout(capture_layout)
+
+        # MIDI Channel (the last entry sends on all 16 channels)
+        channel_layout = self.create_labeled_combo("MIDI Channel", [f"Channel {i + 1}" for i in range(16)] + ["All Channels"])
+        layout.addLayout(channel_layout)
+
+        # Note range, filter, rate and threshold changes apply to a running pipeline on its next frame
         # Min and Max Note
         note_layout = QHBoxLayout()
         note_layout.addLayout(self.create_labeled_slider("Min Note", 0, 127, 21))
         note_layout.addLayout(self.create_labeled_slider("Max Note", 0, 127, 108))
         layout.addLayout(note_layout)
 
-        # Smoothing Window Size
-        layout.addLayout(self.create_labeled_slider("Smoothing Window", 1, 20, 8))
+        # Landmark filter: cutoff in Hz for a still hand, and how fast it opens up with speed
+        filter_layout = QHBoxLayout()
+        filter_layout.addLayout(self.create_labeled_slider("Filter Cutoff", 1, 50, 10, scale=10))
+        filter_layout.addLayout(self.create_labeled_slider("Filter Beta", 0, 100, 20, scale=10))
+        layout.addLayout(filter_layout)
+
+        # Each hand plays its own voice, on consecutive MIDI channels from the one selected
+        layout.addLayout(self.create_labeled_slider("Max Hands", 1, 4, 2))
+
+        # Hand tracking rate in Hz; the note output keeps following the camera rate
+        inference_layout = QHBoxLayout()
+        inference_layout.addLayout(self.create_labeled_slider("Inference Rate", 5, 120, 60))
+        # More than one worker runs hand tracking in that many processes
+        inference_layout.addLayout(self.create_labeled_slider("Inference Workers", 1, max(1, os.cpu_count() or 1), 1))
+        layout.addLayout(inference_layout)
 
         # Note Change Threshold
         layout.addLayout(self.create_labeled_slider("Note Change Threshold", 1, 20, 6))
 
+        # Notes are limited to a scale; each note gets an equal band of the image height
+        scale_layout = QHBoxLayout()
+        scale_layout.addLayout(self.create_labeled_combo("Scale", [name.replace('_', ' ').title() for name in self.SCALES]))
+        scale_layout.addLayout(self.create_labeled_combo("Root", list(self.NOTE_NAMES)))
+        layout.addLayout(scale_layout)
+        # How far past a note's band, in percent of its height, the hand must move to change note
+        layout.addLayout(self.create_labeled_slider("Hysteresis", 0, 100, 25))
+
+        # Continuous controllers from hand position and pinch, rate limited on the MIDI thread
+        controller_layout = QHBoxLayout()
+        sources = ["Off"] + [name.replace('_', ' ').title() for name in self.CONTROLLER_SOURCES]
+        controller_layout.addLayout(self.create_labeled_combo("Pitch Bend", sources))
+        controller_layout.addLayout(self.create_labeled_combo("CC Source", sources))
+        controller_layout.addLayout(self.create_labeled_slider("CC Number", 0, 127, 74))
+        layout.addLayout(controller_layout)
+
+        # Inference on the whole frame in this thread, or with "Tasks Live Stream" runs the MediaPipe Tasks landmarker asynchronously, from models/hand_landmarker.task
+        layout.addLayout(self.create_labeled_combo("Inference", list(self.INFERENCE_MODES)))
+
+        # Stage timing: an on-screen overlay (FPS, p50/p99 per stage, drops), optionally also written
+        # every 10 s to metrics/ as CSV or as a Prometheus textfile
+        layout.addLayout(self.create_labeled_combo("Metrics", list(self.METRICS_MODES)))
+
+        # Idle mode: without a hand in view, track only on motion or twice a second
+        layout.addLayout(self.create_labeled_combo("Idle Mode", ["On", "Off"]))
+
+        # Landmark recording, for replaying a take with python -m madhand --landmarks
+        layout.addLayout(self.create_labeled_combo("Landmark Recording", ["Off", "On"]))
+
+        # Log verbosity, applied immediately
+        log_level_layout = self.create_labeled_combo("Log Level", list(self.LOG_LEVELS))
+        layout.addLayout(log_level_layout)
+        self.findChild(QComboBox, "Log Level").currentTextChanged.connect(self.set_log_level)
+
+        # Preview frame rate, independent of processing; 0 turns the preview off
+        layout.addLayout(self.create_labeled_slider("Preview FPS", 0, 60, 30))
+        self.findChild(QSlider, "Preview FPS").valueChanged.connect(self.set_preview_fps)
+
         # Run and Stop Buttons
         button_layout = QHBoxLayout()
         self.run_button = QPushButton("RUN")
@@ -330,8 +565,13 @@ class MainWindow(QMainWindow):
         self.stop_button = QPushButton("STOP")
         self.stop_button.clicked.connect(self.stop_processing)
         self.stop_button.setEnabled(False)
+        # Records the MIDI output to recordings/; can be switched on and off while running
+        self.record_button = QPushButton("REC")
+        self.record_button.setCheckable(True)
+        self.record_button.toggled.connect(self.toggle_midi_recording)
         button_layout.addWidget(self.run_button)
         button_layout.addWidget(self.stop_button)
+        button_layout.addWidget(self.record_button)
         layout.addLayout(button_layout)
 
         # Video Display
@@ -345,9 +585,48 @@ class MainWindow(QMainWindow):
         self.log_text = QTextEdit()
         self.log_text.setReadOnly(True)
         self.log_text.setStyleSheet("font-size: 12px;")
+        self.log_text.document().setMaximumBlockCount(self.LOG_MAX_LINES)
         layout.addWidget(self.log_text)
 
+        # Events are appended by the worker thread and shown in batches at a fixed rate
+        self.log_timer = QTimer(self)
+        self.log_timer.timeout.connect(self.flush_log)
+        self.log_timer.start(self.LOG_FLUSH_INTERVAL_MS)
+
         self.video_thread = None
+        self.live_config = None
+        self.live_rate = None
+        for name in self.LIVE_SLIDERS:
+            self.findChild(QSlider, name).valueChanged.connect(self.apply_live_settings)
+        for name in self.LIVE_COMBOS:
+            self.findChild(QComboBox, name).currentIndexChanged.connect(self.apply_live_settings)
+
+        self.warmup_thread = WarmupThread(self.warm, self.findChild(QSlider, "Max Hands").value())
+        self.warmup_thread.midi_ports_found.connect(self.set_midi_ports)
+        self.warmup_thread.model_ready.connect(lambda seconds: self.events.info('startup', "Hand model ready in {:.0f} ms", seconds * 1000))
+        self.warmup_thread.cameras_found.connect(self.set_cameras)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self.warmup_thread.isRunning() and not self.warmup_thread.isFinished():
+            self.events.info('startup', "Window shown {:.0f} ms after launch", (time.perf_counter() - LAUNCH_TIME) * 1000)
+            self.warmup_thread.start()
+
+    def set_midi_ports(self, ports):
+        combo = self.findChild(QComboBox, "MIDI Output")
+        combo.clear()
+        combo.addItems(ports if ports else ["No MIDI ports available"])
+
+    def set_cameras(self, cameras):
+        combo = self.findChild(QComboBox, "Webcam")
+        selected = combo.currentData()
+        combo.clear()
+        if not cameras:
+            cameras = [{'index': 0}]
+        for camera in cameras:
+            combo.addItem(camera_label(camera), camera['index'])
+        if selected is not None and combo.findData(selected) >= 0:
+            combo.setCurrentIndex(combo.findData(selected))
 
     def create_labeled_combo(self, label, items):
         layout = QHBoxLayout()
@@ -359,15 +638,17 @@ class MainWindow(QMainWindow):
         layout.addWidget(combo)
         return layout
 
-    def create_labeled_slider(self, label, min_val, max_val, default_val):
+    def create_labeled_slider(self, label, min_val, max_val, default_val, scale=1):
+        # Sliders are integer; with a scale the shown value is slider value / scale
         layout = QHBoxLayout()
         label_widget = QLabel(label)
         slider = QSlider(Qt.Horizontal)
         slider.setObjectName(label)
         slider.setRange(min_val, max_val)
         slider.setValue(default_val)
-        value_label = QLabel(str(default_val))
-        slider.valueChanged.connect(lambda v: value_label.setText(str(v)))
+        value_text = (lambda v: str(v)) if scale == 1 else (lambda v: f"{v / scale:g}")
+        value_label = QLabel(value_text(default_val))
+        slider.valueChanged.connect(lambda v: value_label.setText(value_text(v)))
         layout.addWidget(label_widget)
         layout.addWidget(slider)
         layout.addWidget(value_label)
@@ -375,30 +656,105 @@ class MainWindow(QMainWindow):
 
     def start_processing(self):
         try:
+            run_time = time.perf_counter()
             midi_port = self.findChild(QComboBox, "MIDI Output").currentText()
-            if midi_port == "No MIDI ports available":
-                raise ValueError("No MIDI ports available")
-            
+            if midi_port in ("No MIDI ports available", "Searching for MIDI ports..."):
+                raise ValueError(midi_port.rstrip('.'))
+            channel = self.findChild(QComboBox, "MIDI Channel").currentIndex()
+            max_num_hands = self.findChild(QSlider, "Max Hands").value()
+            self.live_config = LiveValue(self.engine_config())
+            self.live_rate = LiveValue(self.findChild(QSlider, "Inference Rate").value())
+            metrics_on, metrics_file = self.METRICS_MODES[self.findChild(QComboBox, "Metrics").currentText()]
+            metrics_path = None
+            if metrics_file:
+                metrics_dir = os.path.join(script_dir, 'metrics')
+                os.makedirs(metrics_dir, exist_ok=True)
+                metrics_path = os.path.join(metrics_dir, metrics_file)
             params = {
                 'midi_port': midi_port,
-                'camera_index': self.findChild(QComboBox, "Webcam").currentIndex(),
-                'min_note': self.findChild(QSlider, "Min Note").value(),
-                'max_note': self.findChild(QSlider, "Max Note").value(),
-                'smoothing_window': self.findChild(QSlider, "Smoothing Window").value(),
-                'note_change_threshold': self.findChild(QSlider, "Note Change Threshold").value()
+                'channel_mask': ALL_CHANNELS if channel == 16 else 1 << channel,
+                'voice_masks': None if channel == 16 else voice_masks([(channel + i) % 16 for i in range(max_num_hands)], max_num_hands),
+                'max_num_hands': max_num_hands,
+                'camera_index': self.findChild(QComboBox, "Webcam").currentData(),
+                'capture_size': self.CAPTURE_SIZES[self.findChild(QComboBox, "Resolution").currentText()],
+                'capture_fps': int(self.findChild(QComboBox, "Camera FPS").currentText()),
+                'pixel_format': self.findChild(QComboBox, "Pixel Format").currentText().replace("Auto", "") or None,
+                'config': self.live_config,
+                'inference_rate': self.live_rate,
+                'inference_workers': self.findChild(QSlider, "Inference Workers").value(),
+                'inference': self.INFERENCE_MODES[self.findChild(QComboBox, "Inference").currentText()],
+                'idle': self.findChild(QComboBox, "Idle Mode").currentText() == "On",
+                'tasks_model': os.path.join(script_dir, 'models', 'hand_landmarker.task'),
+                'record_landmarks': self.findChild(QComboBox, "Landmark Recording").currentText() == "On",
+                'record_midi': self.record_button.isChecked(),
+                'metrics': metrics_on,
+                'metrics_path': metrics_path,
+                'run_time': run_time
             }
-            
-            if params['min_note'] >= params['max_note']:
-                raise ValueError("Min Note must be less than Max Note")
-            
-            self.video_thread = VideoThread(params)
+
+            if self.preview is None:
+                from madhand.preprocess import build_tint_lut
+                from madhand.preview import PreviewRenderer
+                self.preview = PreviewRenderer(fps=self.findChild(QSlider, "Preview FPS").value(), tint_lut=build_tint_lut())
+                self.preview.visible = not self.isMinimized()
+
+            self.video_thread = VideoThread(params, self.events, self.preview, self.warm)
             self.video_thread.update_frame.connect(self.update_video)
-            self.video_thread.update_log.connect(self.update_log)
             self.video_thread.start()
             self.run_button.setEnabled(False)
             self.stop_button.setEnabled(True)
         except Exception as e:
-            self.update_log(f"Error starting processing: {str(e)}")
+            self.events.error('ui', "Error starting processing: {}", e)
+
+    def engine_config(self):
+        from madhand.engine import EngineConfig
+        from madhand.mapping import scale_notes
+
+        config = EngineConfig(
+            min_note=self.findChild(QSlider, "Min Note").value(),
+            max_note=self.findChild(QSlider, "Max Note").value(),
+            filter_min_cutoff=self.findChild(QSlider, "Filter Cutoff").value() / 10,
+            filter_beta=self.findChild(QSlider, "Filter Beta").value() / 10,
+            note_change_threshold=self.findChild(QSlider, "Note Change Threshold").value(),
+            scale=self.SCALES[self.findChild(QComboBox, "Scale").currentIndex()],
+            root=self.findChild(QComboBox, "Root").currentIndex(),
+            hysteresis=self.findChild(QSlider, "Hysteresis").value() / 100,
+            controllers=self.controllers(),
+            max_num_hands=self.findChild(QSlider, "Max Hands").value(),
+        )
+        if config.min_note >= config.max_note:
+            raise ValueError("Min Note must be less than Max Note")
+        # Raises ValueError when the range holds no note of the scale
+        scale_notes(config.min_note, config.max_note, config.scale, config.root)
+        return config
+
+    def controllers(self):
+        controllers = []
+        pitch_bend = self.findChild(QComboBox, "Pitch Bend").currentIndex()
+        if pitch_bend:
+            controllers.append((self.CONTROLLER_SOURCES[pitch_bend - 1], 'pitch_bend'))
+        cc_source = self.findChild(QComboBox, "CC Source").currentIndex()
+        if cc_source:
+            controllers.append((self.CONTROLLER_SOURCES[cc_source - 1], self.findChild(QSlider, "CC Number").value()))
+        return tuple(controllers)
+
+    def apply_live_settings(self):
+        if self.live_config is None or not self.stop_button.isEnabled():
+            return
+        try:
+            config = self.engine_config()
+        except ValueError:
+            # Keep playing with the last valid range while a slider passes through an invalid one
+            return
+        # Hand count is fixed for a run; the snapshot keeps the one the engine was built with
+        config = dataclasses.replace(config, max_num_hands=self.live_config.get().max_num_hands)
+        if config != self.live_config.get():
+            self.live_config.set(config)
+        self.live_rate.set(self.findChild(QSlider, "Inference Rate").value())
+
+    def toggle_midi_recording(self, on):
+        if self.video_thread is not None and self.video_thread.isRunning():
+            self.video_thread.record_midi(on)
 
     def stop_processing(self):
         if self.video_thread:
@@ -406,19 +762,46 @@ class MainWindow(QMainWindow):
             self.run_button.setEnabled(True)
             self.stop_button.setEnabled(False)
 
-    def update_video(self, image):
+    def update_video(self, image, index):
+        metrics = self.video_thread.metrics if self.video_thread else None
+        start = time.perf_counter()
         self.video_label.setPixmap(QPixmap.fromImage(image))
-
-    def update_log(self, message):
-        self.log_text.append(message)
-        logging.info(message)
+        self.preview.release(index)
+        if metrics is not None:
+            metrics.record('display', start)
+
+    def set_preview_fps(self, fps):
+        if self.preview is not None:
+            self.preview.set_fps(fps)
+        if fps == 0:
+            self.video_label.clear()
+
+    def changeEvent(self, event):
+        # No preview work while the window is minimized
+        if event.type() == QEvent.WindowStateChange and self.preview is not None:
+            self.preview.visible = not self.isMinimized()
+        super().changeEvent(event)
+
+    def set_log_level(self, name):
+        self.events.level = self.LOG_LEVELS[name]
+
+    def flush_log(self):
+        events = self.events.drain()
+        if not events:
+            return
+        for _, level, _, message in events:
+            logging.log(level, message)
+        self.log_text.append("\n".join(message for _, _, _, message in events))
 
     def closeEvent(self, event):
         if self.video_thread:
             self.video_thread.stop()
+        self.warmup_thread.wait()
+        self.warm.close()
         event.accept()
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
@@ -1,16 +1,48 @@
 import cv2
 import mediapipe as mp
 import mido
-import time
-import numpy as np
-import collections
+import sys
+from madhand.capture import FrameGrabber, LatencyStats
+from madhand.preprocess import FramePreprocessor
+from madhand.channels import channel_mask, voice_masks
+from madhand.midi import MidiDispatcher
+from madhand.midifile import MidiRecorder
+from madhand.engine import EngineConfig, NoteEngine
+from madhand.eventlog import EventLog, DEBUG as DEBUG_LEVEL, INFO
+from madhand.idle import IdleScheduler
+from madhand.inference import SolutionsBackend, TasksBackend
+from madhand.metrics import Metrics, MetricsExporter, NullMetrics
+from madhand.preview import PreviewRenderer
+from madhand.recording import LandmarkRecorder
+from madhand.sources import CaptureFormat, create_source
 
 # Adjustable parameters
 DEBUG = True
 NOTE_CHANGE_THRESHOLD = 6  # Increase this value to reduce sensitivity
-SMOOTHING_WINDOW_SIZE = 8 # Adjust this to change smoothing amount
+FILTER_MIN_CUTOFF = 1.0  # Hz; lower this to smooth a still hand more
+FILTER_BETA = 2.0  # Raise this to make fast movements follow with less lag
+INFERENCE_FPS = 60  # Hand tracking rate; frames in between use the filter's prediction
+SCALE = 'chromatic'  # Or 'major', 'minor', 'pentatonic', ... (see madhand/mapping.py)
+ROOT = 0  # Scale root, 0 = C ... 11 = B
+HYSTERESIS = 0.25  # How far past a note's band, as a fraction of its height, the hand must move to change note
 MIN_NOTE = 21  # A0 (lowest note on a standard piano)
 MAX_NOTE = 108  # C8 (highest note on a standard piano)
+CONTROLLERS = []  # (source, CC number or 'pitch_bend'), e.g. [('index_x', 'pitch_bend'), ('pinch', 74)]
+CONTROL_RATE = 100  # Most controller messages per second per controller and channel
+CAMERA = 1  # Camera index; a video file, image directory or 'synthetic' on the command line replaces it
+CAPTURE_SIZE = None  # (width, height) to ask the camera for, e.g. (1280, 720); None keeps the driver default
+CAPTURE_FPS = 60  # Frame rate to ask the camera for
+PIXEL_FORMAT = 'MJPG'  # Compressed MJPG lets most webcams run above 30 fps; 'YUYV' or None for the driver default
+CAPTURE_BACKEND = None  # Capture API: 'dshow', 'msmf', 'v4l2' or 'avfoundation'; None lets OpenCV pick
+MAX_NUM_HANDS = 2  # Each hand plays its own voice
+MIDI_CHANNELS = [0, 1]  # Channel (0-15) for each hand's voice, reused in turn if there are more hands
+TASKS_MODEL = None  # Path to a hand_landmarker.task bundle to track hands asynchronously with MediaPipe Tasks
+IDLE_MODE = True  # Without a hand in view, track only on motion or twice a second, to save CPU
+PREVIEW_FPS = 30  # Preview window refresh rate, independent of processing; 0 turns it off
+RECORD_MIDI = None  # Path such as 'session.mid' to record the MIDI output, flushed to disk every 2 s
+RECORD_LANDMARKS = None  # Path such as 'take.mhl' to record landmarks for python -m madhand --landmarks
+METRICS = False  # Time each stage and show FPS, p50/p99 per stage and dropped frames on the preview
+METRICS_EXPORT = None  # With METRICS, a path such as 'metrics.csv' or 'madhand.prom' written every 10 s
 
 def debug_print(message):
     if DEBUG:
@@ -32,103 +64,121 @@ try:
     port_num = int(input("Enter the number of the MIDI port you want to use: "))
     midi_port = mido.open_output(available_ports[port_num])
     print(f"Connected to MIDI port: {available_ports[port_num]}")
+    metrics = Metrics() if METRICS else NullMetrics()
+    dispatcher = MidiDispatcher(midi_port, channel_mask(MIDI_CHANNELS), metrics, CONTROL_RATE).start()
+    # Messages are handed to the recorder on the MIDI thread as they are sent and written to disk on its own
+    midi_recorder = MidiRecorder(RECORD_MIDI).start() if RECORD_MIDI else None
+    dispatcher.recorder = midi_recorder
 except Exception as e:
     print(f"Error initializing MIDI: {e}")
     exit()
 
-# Initialize MediaPipe Hands
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
-mp_drawing = mp.solutions.drawing_utils
-
-# Initialize webcam
-cap = cv2.VideoCapture(1)
-if not cap.isOpened():
+# Initialize hand tracking: the Tasks landmarker on its own thread, or MediaPipe Hands in this loop
+if TASKS_MODEL:
+    backend = TasksBackend(TASKS_MODEL, MAX_NUM_HANDS)
+else:
+    hands = mp.solutions.hands.Hands(max_num_hands=MAX_NUM_HANDS, min_detection_confidence=0.7,
+                                     min_tracking_confidence=0.7)
+    backend = SolutionsBackend(hands)
+
+# Initialize webcam (or a source given on the command line) on its own capture thread
+width, height = CAPTURE_SIZE or (None, None)
+requested = CaptureFormat(width, height, CAPTURE_FPS, PIXEL_FORMAT, buffer_size=1, backend=CAPTURE_BACKEND)
+source = create_source(sys.argv[1] if len(sys.argv) > 1 else CAMERA, requested)
+grabber = FrameGrabber(source)
+if not grabber.open():
     print("Error: Could not open webcam.")
     exit()
-
-# Set higher frame rate if supported
-cap.set(cv2.CAP_PROP_FPS, 60)
-
-# Initialize history for smoothing
-note_history = collections.deque(maxlen=SMOOTHING_WINDOW_SIZE)
-velocity_history = collections.deque(maxlen=SMOOTHING_WINDOW_SIZE)
-
-def hand_to_midi(hand_landmarks):
-    global note_history, velocity_history
-    
-    # Use the y-coordinate of the index finger tip for note
-    # Map the full height of the camera to the full MIDI note range
-    raw_note = int(np.interp(hand_landmarks.landmark[8].y, [0, 1], [MAX_NOTE, MIN_NOTE]))
-    
-    # Use the y-coordinate of the thumb tip for velocity
-    raw_velocity = int(np.interp(hand_landmarks.landmark[4].y, [0, 1], [127, 30]))
-    
-    # Add to history
-    note_history.append(raw_note)
-    velocity_history.append(raw_velocity)
-    
-    # Calculate smoothed values
-    note = int(sum(note_history) / len(note_history))
-    velocity = int(sum(velocity_history) / len(velocity_history))
-    
-    return note, velocity
-
-def is_fist(hand_landmarks):
-    # Check if the fingertips are below the middle phalanges
-    return all(hand_landmarks.landmark[tip].y > hand_landmarks.landmark[mid].y 
-               for tip, mid in [(8,6), (12,10), (16,14), (20,18)])
-
-last_note = None
-last_time = time.time()
-hold_note = False
+print(f"Capturing {source.granted.describe()}")
+for name, asked, granted in source.mismatches():
+    print(f"Warning: camera did not grant {name} {asked}, got {granted}")
+latency = LatencyStats()
+preprocessor = FramePreprocessor(tint=False)
+preview = PreviewRenderer(fps=PREVIEW_FPS)
+
+# Note mapping, smoothing and fist hold live in the shared engine
+config = EngineConfig(
+    min_note=MIN_NOTE,
+    max_note=MAX_NOTE,
+    filter_min_cutoff=FILTER_MIN_CUTOFF,
+    filter_beta=FILTER_BETA,
+    note_change_threshold=NOTE_CHANGE_THRESHOLD,
+    scale=SCALE,
+    root=ROOT,
+    hysteresis=HYSTERESIS,
+    controllers=tuple(CONTROLLERS),
+    max_num_hands=MAX_NUM_HANDS,
+)
+events = EventLog(level=DEBUG_LEVEL if DEBUG else INFO)
+engine = NoteEngine(config, dispatcher, events, voice_masks(MIDI_CHANNELS, MAX_NUM_HANDS))
+recorder = LandmarkRecorder(RECORD_LANDMARKS, MAX_NUM_HANDS) if RECORD_LANDMARKS else None
+exporter = MetricsExporter(metrics, METRICS_EXPORT) if METRICS and METRICS_EXPORT else None
+last_inference = 0.0
+idle = IdleScheduler() if IDLE_MODE else None
+last_roll = 0.0
+overlay = []
+detected = []
 
 try:
-    while cap.isOpened():
-        success, image = cap.read()
-        if not success:
-            debug_print("Ignoring empty camera frame.")
+    while True:
+        frame = grabber.read()
+        if frame is None:
+            if grabber.finished:
+                break
+            debug_print("Waiting for camera frame.")
             continue
-
-        image = cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB)
-        results = hands.process(image)
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-
-        debug_print(f"Hand detected: {results.multi_hand_landmarks is not None}")
-
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                mp_drawing.draw_landmarks(image, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-
-                fist = is_fist(hand_landmarks)
-                if fist:
-                    hold_note = True
-                    debug_print("Fist detected, holding note")
-                else:
-                    hold_note = False
-                    debug_print("Hand open, ready to change note")
-
-                note, velocity = hand_to_midi(hand_landmarks)
-                debug_print(f"Smoothed note: {note}, velocity: {velocity}")
-
-                if not hold_note and (last_note is None or abs(note - last_note) >= NOTE_CHANGE_THRESHOLD):
-                    if last_note is not None:
-                        for channel in range(16):
-                            midi_port.send(mido.Message('note_off', note=last_note, channel=channel))
-                            debug_print(f"Sent Note Off: {last_note} on channel {channel}")
-                    for channel in range(16):
-                        midi_port.send(mido.Message('note_on', note=note, velocity=velocity, channel=channel))
-                        debug_print(f"Sent Note On: {note}, Velocity: {velocity} on channel {channel}")
-                    last_note = note
-                    last_time = time.time()
-
-        elif last_note is not None and time.time() - last_time > 0.1:
-            for channel in range(16):
-                midi_port.send(mido.Message('note_off', note=last_note, channel=channel))
-                debug_print(f"Sent Note Off (no hand): {last_note} on channel {channel}")
-            last_note = None
-
-        cv2.imshow('Hand Controlled Synthesizer', image)
+        metrics.record('capture', frame.timestamp)
+        metrics.frame(grabber.dropped)
+
+        # The preview is the flipped BGR buffer itself, so no RGB->BGR round trip is needed
+        start = metrics.clock()
+        rgb, image = preprocessor.process(frame.image)
+        metrics.record('preprocess', start)
+        start = metrics.clock()
+        due = frame.timestamp - last_inference >= 0.75 / INFERENCE_FPS
+        if due and (idle is None or idle.should_infer(rgb, frame.timestamp)) and backend.submit(rgb, frame.timestamp):
+            last_inference = frame.timestamp
+        results = backend.poll()
+        if results:
+            metrics.record('inference', start)
+
+        start = metrics.clock()
+        started = False
+        note_time = frame.timestamp
+        for timestamp, detected in results:
+            if idle is not None:
+                idle.update(detected, timestamp)
+            if recorder is not None:
+                recorder.write(timestamp, detected)
+            debug_print(f"Hand detected: {bool(detected)}")
+            if engine.process(detected, timestamp):
+                started = True
+                note_time = timestamp
+        if not results:
+            started = engine.tick(frame.timestamp)
+        metrics.record('engine', start)
+
+        if started:
+            note_latency = latency.record(note_time)
+            debug_print(f"Capture-to-note latency: {note_latency * 1000:.1f} ms")
+
+        for _, _, _, message in events.drain():
+            debug_print(message)
+
+        start = metrics.clock()
+        rendered = preview.render(image, detected, frame.timestamp, overlay)
+        if rendered is not None:
+            index, buffer = rendered
+            cv2.imshow('Hand Controlled Synthesizer', buffer)
+            preview.release(index)
+            metrics.record('preview', start)
+
+        if metrics.enabled and frame.timestamp - last_roll >= 1.0:
+            last_roll = frame.timestamp
+            metrics.roll()
+            overlay = metrics.overlay_lines()
+            if exporter is not None:
+                exporter.maybe_export()
         if cv2.waitKey(5) & 0xFF == 27:  
             break
 
@@ -136,7 +186,20 @@ except Exception as e:
     print(f"An error occurred: {e}")
 
 finally:
-    cap.release()
+    grabber.close()
+    backend.close()
+    if recorder is not None:
+        recorder.close()
     cv2.destroyAllWindows()
+    engine.release()
+    dispatcher.stop()
     midi_port.close()
+    if midi_recorder is not None:
+        midi_recorder.stop()
+        print(f"Recorded {midi_recorder.recorded} MIDI messages to {RECORD_MIDI}")
+    if exporter is not None:
+        exporter.export()
+    print(latency.summary(grabber))
+    if idle is not None:
+        print(idle.summary())
     print("Program ended.")
\ No newline at end of file
@@ -0,0 +1,60 @@
+"""What a camera grants for each requested format, and the frame rate it actually delivers.
+
+Each format is opened in turn and read for ``--seconds`` through a ``FrameGrabber``
+consumed as fast as possible, so the measured rate is the device's, not the pipeline's.
+Without a camera, ``--source synthetic`` or a video path exercises the same path.
+
+Usage: python benchmarks/bench_capture.py [--source 0] [--size 1280x720] [--fps 60] [--seconds 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from madhand.capture import FrameGrabber
+from madhand.sources import CaptureFormat, create_source, parse_size
+
+
+def measure(spec, requested, seconds):
+    source = create_source(spec, requested)
+    grabber = FrameGrabber(source)
+    start = time.perf_counter()
+    if not grabber.open():
+        return None
+    opened = time.perf_counter() - start
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline and not grabber.finished:
+        grabber.read(timeout=0.1)
+    grabber.close()
+    return source, opened, grabber
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--source', default='0', help="camera index, video path or 'synthetic'")
+    parser.add_argument('--size', type=parse_size, help="resolution to ask for, e.g. 1280x720")
+    parser.add_argument('--fps', type=float, default=60.0)
+    parser.add_argument('--backend', help="capture API, e.g. dshow, msmf, v4l2 or avfoundation")
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    width, height = args.size or (None, None)
+    print(f"{'asked':<9} {'buffer':>6}  {'granted':<48} {'open ms':>7} {'got fps':>7} {'dropped':>7}")
+    for fourcc in ('MJPG', 'YUYV', None):
+        for buffer_size in (1, None):
+            requested = CaptureFormat(width, height, args.fps, fourcc, buffer_size, args.backend)
+            result = measure(args.source, requested, args.seconds)
+            asked = fourcc or 'default'
+            if result is None:
+                print(f"{asked:<9} {buffer_size or '-':>6}  could not open {args.source}")
+                return
+            source, opened, grabber = result
+            print(f"{asked:<9} {buffer_size or '-':>6}  {source.granted.describe():<48} {opened * 1000:7.0f} "
+                  f"{grabber.capture_fps():7.1f} {grabber.dropped:>7}")
+            for name, wanted, granted in source.mismatches():
+                print(f"{'':<18}{name}: asked {wanted}, got {granted}")
+
+
+if __name__ == '__main__':
+    main()
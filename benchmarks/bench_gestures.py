@@ -0,0 +1,88 @@
+"""Per-hand cost of gesture recognition as gestures are added, against checking gestures one by one in Python.
+
+Hands are generated from a simple joint model (see ``common.synthetic_hand``) in random poses,
+so no recording is needed. Also times converting MediaPipe's landmark protobufs into
+the ``(21, 3)`` array the engine works on.
+
+Usage: python benchmarks/bench_gestures.py [--hands 2000] [--max-gestures 64]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.common import random_hands
+from madhand.gestures import ANY, CURLED, DEFAULT_GESTURES, EXTENDED, Gesture, GestureClassifier
+from madhand.landmarks import landmark_array
+
+# (fingertip, middle phalanx) pairs for index, middle, ring and little finger, for the Python checks
+FINGERS = ((8, 6), (12, 10), (16, 14), (20, 18))
+
+
+def extra_gestures(count, rng):
+    """``count`` made-up finger patterns, to grow the gesture set."""
+    states = (ANY, CURLED, EXTENDED)
+    return [Gesture(f'custom_{i}', tuple(int(rng.choice(states)) for _ in range(5)), None) for i in range(count)]
+
+
+def python_matches(gestures, landmarks):
+    """Per-gesture, per-finger Python checks, in the style of the fingertip-below-joint fist test the classifier replaced."""
+    found = []
+    for gesture in gestures:
+        ok = True
+        for finger, state in enumerate(gesture.fingers[1:]):
+            tip, mid = FINGERS[finger]
+            if state == CURLED and not landmarks[tip, 1] > landmarks[mid, 1]:
+                ok = False
+            elif state == EXTENDED and not landmarks[tip, 1] < landmarks[mid, 1]:
+                ok = False
+        found.append(ok)
+    return found
+
+
+def time_per_hand(function, hands):
+    start = time.perf_counter()
+    for landmarks in hands:
+        function(landmarks)
+    return (time.perf_counter() - start) / len(hands) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hands', type=int, default=2000)
+    parser.add_argument('--max-gestures', type=int, default=64)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+    hands = random_hands(args.hands, rng)
+
+    try:
+        from mediapipe.framework.formats import landmark_pb2
+        protos = []
+        for landmarks in hands[:500]:
+            proto = landmark_pb2.NormalizedLandmarkList()
+            for x, y, z in landmarks.tolist():
+                point = proto.landmark.add()
+                point.x, point.y, point.z = x, y, z
+            protos.append(proto.landmark)
+        listed = time_per_hand(lambda points: np.array([(p.x, p.y, p.z) for p in points], dtype=np.float32), protos)
+        print(f"protobuf to (21, 3): {listed:6.2f} us per hand with a tuple list, "
+              f"{time_per_hand(landmark_array, protos):6.2f} us with landmark_array")
+    except ImportError:
+        print("protobuf to (21, 3): skipped, mediapipe is not installed")
+
+    print(f"{'gestures':>8} {'vectorised us':>13} {'python us':>9}")
+    count = len(DEFAULT_GESTURES)
+    while count <= args.max_gestures:
+        gestures = DEFAULT_GESTURES + tuple(extra_gestures(count - len(DEFAULT_GESTURES), rng))
+        classifier = GestureClassifier(gestures)
+        vectorised = time_per_hand(classifier.classify, hands)
+        python = time_per_hand(lambda landmarks: python_matches(gestures, landmarks), hands)
+        print(f"{count:>8} {vectorised:>13.2f} {python:>9.2f}")
+        count *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""CPU time with and without idle mode, on a video with idle stretches or a generated one.
+
+The generated clip is a still, noisy scene where a block moves through the frame for one
+second out of every ``--period``; for it the number of frames from each motion onset to
+the first tracked frame is reported as well.
+
+Usage: python benchmarks/bench_idle.py [take.mp4] [--seconds 60] [--period 10] [--fps 30]
+"""
+import argparse
+import os
+import sys
+import time
+
+import mediapipe as mp
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.common import load_frames, rgb_frames
+from madhand.idle import IdleScheduler
+from madhand.inference import SolutionsBackend
+
+
+def synthetic_frames(seconds, period, fps, width=640, height=360):
+    """Frames as a generator, and the indices where motion starts."""
+    rng = np.random.default_rng(0)
+    background = rng.integers(60, 120, (height, width, 3), dtype=np.uint8)
+    count = int(seconds * fps)
+    onsets = list(range(int(period * fps / 2), count, int(period * fps)))
+
+    def frames():
+        for i in range(count):
+            frame = background.copy()
+            # Sensor noise, below the motion threshold
+            frame += rng.integers(0, 4, (height, width, 3), dtype=np.uint8)
+            for onset in onsets:
+                if onset <= i < onset + fps:
+                    x = int((i - onset) / fps * (width - 120))
+                    frame[120:240, x:x + 120] = 230
+            yield frame
+
+    return frames(), onsets
+
+
+def run(frames, fps, idle):
+    hands = mp.solutions.hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
+    backend = SolutionsBackend(hands)
+    tracked = []
+    cpu = time.process_time()
+    for i, rgb in enumerate(frames):
+        now = i / fps
+        if idle is None or idle.should_infer(rgb, now):
+            backend.submit(rgb, now)
+            tracked.append(i)
+        for timestamp, found in backend.poll():
+            if idle is not None:
+                idle.update(found, timestamp)
+    cpu = time.process_time() - cpu
+    hands.close()
+    return cpu, tracked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('video', nargs='?')
+    parser.add_argument('--seconds', type=float, default=60.0, help="length of the generated clip")
+    parser.add_argument('--period', type=float, default=10.0, help="seconds between motion in the generated clip")
+    parser.add_argument('--fps', type=float, default=30.0)
+    args = parser.parse_args()
+
+    if args.video:
+        frames = rgb_frames(load_frames(args.video, 0))
+        onsets = []
+    else:
+        generated, onsets = synthetic_frames(args.seconds, args.period, args.fps)
+        frames = list(generated)
+    duration = len(frames) / args.fps
+    print(f"{len(frames)} frames, {duration:.0f} s of video")
+
+    cpu_off, tracked_off = run(frames, args.fps, None)
+    idle = IdleScheduler()
+    cpu_on, tracked_on = run(frames, args.fps, idle)
+    print(f"idle mode off: {cpu_off:6.2f} CPU s ({cpu_off / duration * 100:5.1f}% of a core), "
+          f"{len(tracked_off)} frames tracked")
+    print(f"idle mode on : {cpu_on:6.2f} CPU s ({cpu_on / duration * 100:5.1f}% of a core), "
+          f"{len(tracked_on)} frames tracked, {cpu_off - cpu_on:.2f} CPU s saved")
+    print(idle.summary())
+
+    if onsets:
+        tracked = np.array(tracked_on)
+        waits = [int(tracked[np.searchsorted(tracked, onset)] - onset) for onset in onsets
+                 if np.searchsorted(tracked, onset) < len(tracked)]
+        print(f"frames from motion onset to tracking: {waits}")
+
+
+if __name__ == '__main__':
+    main()
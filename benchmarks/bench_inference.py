@@ -0,0 +1,83 @@
+"""Legacy Hands and Tasks live-stream backends side by side on a recorded video, replayed in real time.
+
+Frames are fed at the video's frame rate like a camera would. For each backend it reports
+how long the loop was blocked per frame, how many frames got a result, and the
+capture-to-result latency.
+
+Usage: python benchmarks/bench_inference.py take.mp4 --model hand_landmarker.task [--fps 30] [--upscale 720]
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.common import load_frames, rgb_frames
+from madhand.inference import SolutionsBackend, TasksBackend, wait_idle
+
+
+def replay(backend, frames, fps):
+    # Warm up: the first inference includes graph setup
+    backend.submit(frames[0], time.perf_counter())
+    wait_idle(backend)
+    backend.submitted = backend.dropped = 0
+
+    blocked, latencies = [], []
+    interval = 1.0 / fps
+    start = next_time = time.perf_counter()
+    for rgb in frames:
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        next_time += interval
+
+        captured = time.perf_counter()
+        backend.submit(rgb, captured)
+        results = backend.poll()
+        now = time.perf_counter()
+        blocked.append(now - captured)
+        latencies += [now - timestamp for timestamp, _ in results]
+    for timestamp, _ in wait_idle(backend):
+        latencies.append(time.perf_counter() - timestamp)
+    elapsed = time.perf_counter() - start
+    backend.close()
+    return elapsed, blocked, latencies
+
+
+def report(name, frames, elapsed, blocked, latencies):
+    blocked_ms = np.percentile(np.array(blocked) * 1000, [50, 95])
+    latency_ms = np.percentile(np.array(latencies) * 1000, [50, 95]) if latencies else (0.0, 0.0)
+    print(f"{name:<12} {len(latencies) / elapsed:8.1f} {len(latencies):>5}/{len(frames):<5} "
+          f"{blocked_ms[0]:7.2f} {blocked_ms[1]:7.2f} {latency_ms[0]:7.1f} {latency_ms[1]:7.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('video')
+    parser.add_argument('--model', help="hand_landmarker.task bundle for the Tasks backend")
+    parser.add_argument('--fps', type=float, help="replay rate; defaults to the video's frame rate")
+    parser.add_argument('--upscale', type=int, default=0, help="resize frames to this height first, e.g. 720 or 1080")
+    args = parser.parse_args()
+
+    fps = args.fps or cv2.VideoCapture(args.video).get(cv2.CAP_PROP_FPS) or 30.0
+    frames = rgb_frames(load_frames(args.video, args.upscale))
+    height, width = frames[0].shape[:2]
+    print(f"{len(frames)} frames at {width}x{height}, replayed at {fps:g} fps")
+    print(f"{'backend':<12} {'results/s':>8} {'tracked':>11} {'blk p50':>7} {'p95 ms':>7} "
+          f"{'lat p50':>7} {'p95 ms':>7}")
+
+    hands = mp.solutions.hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
+    report('legacy', frames, *replay(SolutionsBackend(hands), frames, fps))
+    hands.close()
+    if args.model:
+        report('tasks', frames, *replay(TasksBackend(args.model), frames, fps))
+    else:
+        print("tasks        skipped, pass --model hand_landmarker.task")
+
+
+if __name__ == '__main__':
+    main()
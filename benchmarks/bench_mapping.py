@@ -0,0 +1,79 @@
+"""Per-call cost of the np.interp note mapping and the NoteMap lookup tables.
+
+Also counts note changes on a slow, jittery sweep with and without hysteresis.
+
+Usage: python benchmarks/bench_mapping.py [--calls 200000] [--scale chromatic] [--jitter 0.004]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from madhand.engine import EngineConfig
+from madhand.mapping import SCALES, NoteMap
+
+
+def legacy_hand_to_midi(y_note, y_velocity, config):
+    # The mapping NoteEngine.hand_to_midi used before NoteMap
+    note = int(np.interp(y_note, [0, 1], [config.max_note, config.min_note]))
+    velocity = int(np.interp(y_velocity, [0, 1], [127, 30]))
+    return note, velocity
+
+
+def table_hand_to_midi(y_note, y_velocity, note_map, zone=-1):
+    zone = note_map.zone(y_note, zone)
+    return note_map.notes[zone], note_map.velocity(y_velocity), zone
+
+
+def per_call(fn, ys):
+    start = time.perf_counter()
+    for y in ys:
+        fn(y)
+    return (time.perf_counter() - start) / len(ys)
+
+
+def changes(notes):
+    return sum(1 for a, b in zip(notes, notes[1:]) if a != b)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=200000)
+    parser.add_argument('--scale', choices=sorted(SCALES), default='chromatic')
+    parser.add_argument('--jitter', type=float, default=0.004, help="landmark noise, in image heights")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    ys = rng.random(args.calls).tolist()
+    config = EngineConfig(scale=args.scale)
+
+    start = time.perf_counter()
+    note_map = NoteMap.from_config(config)
+    build = time.perf_counter() - start
+
+    legacy = per_call(lambda y: legacy_hand_to_midi(y, y, config), ys)
+    table = per_call(lambda y: table_hand_to_midi(y, y, note_map), ys)
+    print(f"NoteMap build ({len(note_map.notes)} zones): {build * 1000:.2f} ms")
+    print(f"np.interp : {legacy * 1e6:6.2f} us/call")
+    print(f"NoteMap   : {table * 1e6:6.2f} us/call ({legacy / table:.1f}x)")
+
+    # One slow top-to-bottom sweep over 10 s at 60 fps, with landmark noise
+    sweep = np.clip(np.linspace(0.0, 1.0, 600) + rng.normal(0.0, args.jitter, 600), 0.0, 1.0).tolist()
+    legacy_notes = [legacy_hand_to_midi(y, y, config)[0] for y in sweep]
+    print(f"Note changes on a jittery sweep: np.interp {changes(legacy_notes)}", end='')
+    for hysteresis in (0.0, 0.25, 0.5):
+        note_map = NoteMap.from_config(EngineConfig(scale=args.scale, hysteresis=hysteresis))
+        zone = -1
+        notes = []
+        for y in sweep:
+            note, _, zone = table_hand_to_midi(y, y, note_map, zone)
+            notes.append(note)
+        print(f", hysteresis {hysteresis:g} {changes(notes)}", end='')
+    print(f" (distinct notes: {len(set(legacy_notes))})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Hand-tracking throughput and latency with 1..N worker processes on a recorded video.
+
+Usage: python benchmarks/bench_parallel.py take.mp4 [--max-workers 4] [--upscale 1080]
+"""
+import argparse
+import os
+import sys
+import time
+
+import mediapipe as mp
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.common import load_frames, rgb_frames
+from madhand.landmarks import hands_from_results
+from madhand.parallel import ParallelInference
+
+
+def percentiles(latencies):
+    return np.percentile(np.array(latencies) * 1000, [50, 95])
+
+
+def run_inline(frames):
+    hands = mp.solutions.hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
+    latencies = []
+    start = time.perf_counter()
+    for rgb in frames:
+        submitted = time.perf_counter()
+        hands_from_results(hands.process(rgb))
+        latencies.append(time.perf_counter() - submitted)
+    elapsed = time.perf_counter() - start
+    hands.close()
+    return len(frames) / elapsed, percentiles(latencies)
+
+
+def run_pool(frames, workers):
+    pool = ParallelInference(workers=workers)
+    # Every worker loads its model and runs a first inference before timing starts
+    pool.wait_ready(frames[0].shape)
+
+    latencies = []
+    start = time.perf_counter()
+    index = 0
+    done = 0
+    while done < len(frames):
+        while index < len(frames) and pool.submit(frames[index], time.perf_counter()):
+            index += 1
+        for submitted, _ in pool.poll(timeout=1.0):
+            latencies.append(time.perf_counter() - submitted)
+            done += 1
+    elapsed = time.perf_counter() - start
+    pool.close()
+    return len(frames) / elapsed, percentiles(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('video')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--upscale', type=int, default=0, help="resize frames to this height first, e.g. 720 or 1080")
+    args = parser.parse_args()
+
+    frames = rgb_frames(load_frames(args.video, args.upscale))
+    height, width = frames[0].shape[:2]
+    print(f"{len(frames)} frames at {width}x{height}")
+    print(f"{'mode':<12} {'fps':>7} {'p50 ms':>7} {'p95 ms':>7}")
+
+    fps, (p50, p95) = run_inline(frames)
+    print(f"{'in-thread':<12} {fps:7.1f} {p50:7.1f} {p95:7.1f}")
+    for workers in range(1, args.max_workers + 1):
+        fps, (p50, p95) = run_pool(frames, workers)
+        print(f"{f'{workers} workers':<12} {fps:7.1f} {p50:7.1f} {p95:7.1f}")
+
+
+if __name__ == '__main__':
+    main()
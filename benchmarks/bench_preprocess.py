@@ -0,0 +1,73 @@
+"""Per-frame time and allocations of the old and the buffered preprocessing paths.
+
+Usage: python benchmarks/bench_preprocess.py [--width 1920] [--height 1080] [--frames 200]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from madhand.preprocess import FramePreprocessor
+
+
+def legacy_preprocess(image, preview=True):
+    # The path VideoThread.run used before FramePreprocessor
+    image = cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB)
+    green_tinted = image.copy()
+    green_tinted[:, :, 0] = image[:, :, 0] * 0.5
+    green_tinted[:, :, 2] = image[:, :, 2] * 0.5
+    green_tinted[:, :, 1] = np.clip(image[:, :, 1] * 1.2, 0, 255)
+    return image, cv2.cvtColor(green_tinted, cv2.COLOR_RGB2BGR)
+
+
+def measure(fn, frames, preview):
+    fn(frames[0], preview)  # warm up buffers and caches
+
+    start = time.perf_counter()
+    for image in frames:
+        fn(image, preview)
+    per_frame = (time.perf_counter() - start) / len(frames)
+
+    tracemalloc.start()
+    allocated = 0
+    for image in frames[:20]:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        fn(image, preview)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return per_frame, allocated / min(len(frames), 20)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8) for _ in range(8)]
+    frames = (frames * (args.frames // len(frames) + 1))[:args.frames]
+
+    # Sanity check: both paths must produce identical pixels
+    old_rgb, old_preview = legacy_preprocess(frames[0])
+    new_rgb, new_preview = FramePreprocessor().process(frames[0])
+    assert np.array_equal(old_rgb, new_rgb) and np.array_equal(old_preview, new_preview)
+
+    preprocessor = FramePreprocessor()
+    print(f"{args.width}x{args.height}, {args.frames} frames")
+    for name, fn in (('legacy', legacy_preprocess), ('buffered', preprocessor.process)):
+        for preview in (True, False):
+            per_frame, allocated = measure(fn, frames, preview)
+            print(f"{name:>8} preview={'on ' if preview else 'off'}  "
+                  f"{per_frame * 1000:7.2f} ms/frame  {allocated / 1e6:7.2f} MB allocated/frame")
+
+
+if __name__ == '__main__':
+    main()
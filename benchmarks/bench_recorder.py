@@ -0,0 +1,110 @@
+"""Checks that the MIDI session recorder keeps every message, and reports its effect on the frame loop's latency.
+
+The loop runs the engine on generated hand movement at ``--fps``, like the vision loop
+after inference, sending on all 16 channels with pitch bend streaming, so the recorder
+gets far more messages than a normal session. Runs with the recorder off and on
+alternate for ``--rounds`` rounds. The check fails, with exit status 1, unless every
+run with the recorder on:
+
+- recorded as many messages as the dispatcher sent, with none dropped;
+- left a .mid file that mido reads back as exactly the messages sent, in order.
+
+Loop times from all rounds are pooled and reported as p50/p95/p99 with the recorder off
+and on. They are not checked, since a few short runs on a shared machine vary more
+than the recorder costs.
+
+Usage: python benchmarks/bench_recorder.py [--seconds 5] [--fps 120] [--hands 2] [--rounds 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import mido
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.common import synthetic_take
+from madhand.channels import ALL_CHANNELS
+from madhand.engine import EngineConfig, NoteEngine
+from madhand.midi import InMemorySink, MidiDispatcher
+from madhand.midifile import MidiRecorder
+
+
+def run(frames, fps, config, path=None):
+    sink = InMemorySink()
+    dispatcher = MidiDispatcher(sink, ALL_CHANNELS).start()
+    recorder = MidiRecorder(path).start() if path else None
+    dispatcher.recorder = recorder
+    engine = NoteEngine(config, dispatcher)
+    loop = []
+    interval = 1.0 / fps
+    next_time = time.perf_counter()
+    for now, hands in frames:
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        next_time += interval
+        start = time.perf_counter()
+        engine.process(hands, now)
+        loop.append(time.perf_counter() - start)
+    engine.release()
+    dispatcher.stop()
+    if recorder is not None:
+        recorder.stop()
+    return np.array(loop) * 1e6, dispatcher, recorder, [message for _, message in sink.messages]
+
+
+def check_recording(dispatcher, recorder, sent):
+    """Problems with what ``recorder`` wrote, given the ``sent`` messages."""
+    problems = []
+    if recorder.recorded != dispatcher.sent or recorder.dropped:
+        problems.append(f"recorded {recorder.recorded} of {dispatcher.sent} messages sent, {recorder.dropped} dropped")
+    read = [message.bytes() for message in mido.MidiFile(recorder.path).tracks[0] if not message.is_meta]
+    expected = [message.bytes() for message in sent]
+    if read != expected:
+        differ = next((i for i, (a, b) in enumerate(zip(read, expected)) if a != b), min(len(read), len(expected)))
+        problems.append(f"file holds {len(read)} messages, {len(expected)} sent, first difference at {differ}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--fps', type=float, default=120.0)
+    parser.add_argument('--hands', type=int, default=2)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    frames = synthetic_take(args.seconds, args.fps, args.hands)
+    config = EngineConfig(note_change_threshold=2, controllers=(('index_x', 'pitch_bend'), ('pinch', 74)),
+                          max_num_hands=args.hands)
+    print(f"{len(frames)} frames at {args.fps:g} fps, {args.hands} hands, all 16 channels")
+    print(f"{'recorder':<9} {'p50 us':>7} {'p99 us':>7} {'max us':>7} {'sent':>6} {'recorded':>8} {'dropped':>7}")
+    loops = {'off': [], 'on': []}
+    problems = []
+    with tempfile.TemporaryDirectory() as directory:
+        for round in range(args.rounds):
+            for name in ('off', 'on'):
+                path = os.path.join(directory, f'session-{round}.mid') if name == 'on' else None
+                loop, dispatcher, recorder, sent = run(frames, args.fps, config, path)
+                p50, p99 = np.percentile(loop, [50, 99])
+                loops[name].append(loop)
+                recorded = f"{recorder.recorded:>8} {recorder.dropped:>7}" if recorder else f"{'-':>8} {'-':>7}"
+                print(f"{name:<9} {p50:7.1f} {p99:7.1f} {loop.max():7.1f} {dispatcher.sent:>6} {recorded}")
+                if recorder is not None:
+                    problems += [f"round {round + 1}: {problem}" for problem in check_recording(dispatcher, recorder, sent)]
+
+    for name in ('off', 'on'):
+        p50, p95, p99 = np.percentile(np.concatenate(loops[name]), [50, 95, 99])
+        print(f"all rounds, recorder {name}: p50 {p50:.1f} us, p95 {p95:.1f} us, p99 {p99:.1f} us")
+    for problem in problems:
+        print(f"FAIL {problem}")
+    if problems:
+        sys.exit(1)
+    print("OK: every message recorded and read back")
+
+
+if __name__ == '__main__':
+    main()
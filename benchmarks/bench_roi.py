@@ -0,0 +1,97 @@
+"""Hand-tracking latency and accuracy on a recorded video, full frame versus hand region.
+
+Full-frame tracking is the reference. It is compared with the whole frame downscaled to
+``--inference-width`` and with ``RoiTracker``. Accuracy is the share of the reference's
+hand frames where hands were found, and the mean landmark distance from the
+reference's, in pixels.
+
+Usage: python benchmarks/bench_roi.py take.mp4 [--inference-width 640] [--upscale 1080]
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.common import load_frames
+from madhand.landmarks import hands_from_results
+from madhand.preprocess import FramePreprocessor
+from madhand.roi import RoiTracker
+
+
+def hands_model():
+    return mp.solutions.hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
+
+
+def run(frames, detect):
+    """Per-frame ``(hands, milliseconds)``."""
+    preprocessor = FramePreprocessor()
+    results = []
+    for image in frames:
+        rgb, _ = preprocessor.process(image, preview=False)
+        start = time.perf_counter()
+        hands = detect(rgb)
+        results.append((hands, (time.perf_counter() - start) * 1000))
+    return results
+
+
+def landmark_error(hands, reference, size):
+    """Mean distance in pixels from each reference hand to the nearest found hand."""
+    errors = []
+    for expected in reference:
+        distances = [np.linalg.norm((hand.landmarks[:, :2] - expected.landmarks[:, :2]) * size, axis=1).mean()
+                     for hand in hands]
+        if distances:
+            errors.append(min(distances))
+    return errors
+
+
+def report(name, results, reference, size):
+    times = np.array([ms for _, ms in results])
+    expected = [hands for hands, _ in reference]
+    with_hands = sum(bool(hands) for hands in expected)
+    found = sum(bool(hands) for (hands, _), wanted in zip(results, expected) if wanted)
+    extra = sum(bool(hands) for (hands, _), wanted in zip(results, expected) if not wanted)
+    errors = [e for (hands, _), wanted in zip(results, expected) for e in landmark_error(hands, wanted, size)]
+    error = f"{np.mean(errors):6.1f} px" if errors else "     n/a"
+    print(f"{name:<22} {np.percentile(times, 50):7.1f} {np.percentile(times, 99):7.1f} "
+          f"{found:>6}/{with_hands:<6} {extra:>5}  {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('video')
+    parser.add_argument('--inference-width', type=int, default=640)
+    parser.add_argument('--upscale', type=int, default=0, help="resize frames to this height first, e.g. 720 or 1080")
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.upscale)
+    height, width = frames[0].shape[:2]
+    size = np.array([width, height])
+    print(f"{len(frames)} frames at {width}x{height}")
+
+    hands = hands_model()
+    reference = run(frames, lambda rgb: hands_from_results(hands.process(rgb)))
+    hands.close()
+
+    print(f"{'':<22} {'p50 ms':>7} {'p99 ms':>7} {'hand frames':>13} {'extra':>5}  {'error':>9}")
+    report("full frame", reference, reference, size)
+    hands = hands_model()
+    small = (args.inference_width, round(height * args.inference_width / width))
+    report(f"full frame at {args.inference_width}",
+           run(frames, lambda rgb: hands_from_results(hands.process(cv2.resize(rgb, small)))), reference, size)
+    hands.close()
+    hands = hands_model()
+    tracker = RoiTracker(hands, inference_width=args.inference_width)
+    report("hand region", run(frames, tracker.process), reference, size)
+    hands.close()
+    print(f"{'':<22} {tracker.roi_frames} region, {tracker.full_frames} full-frame inferences, "
+          f"{tracker.resets} model resets")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Checks that a landmark take cut short mid-record still replays, up to its last whole frame.
+
+Writes a take of random hands, truncates copies of it at every byte offset inside the
+last record and at the end of the header, and replays each one. Exits with status 1 on
+a mismatch.
+
+Usage: python benchmarks/check_recording.py [--frames 50]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from madhand.landmarks import Hand
+from madhand.recording import HEADER_DTYPE, LandmarkRecorder, LandmarkRecording
+
+
+def write_take(path, frames, rng):
+    recorder = LandmarkRecorder(path, max_hands=2)
+    written = []
+    for i in range(frames):
+        hands = [Hand(rng.random((21, 3), dtype=np.float32), 'Right', 0.9) for _ in range(i % 3)]
+        recorder.write(i / 30.0, hands)
+        written.append(hands)
+    recorder.close()
+    return written
+
+
+def check(path, expected):
+    """Problems found replaying ``path``, which should hold the hands in ``expected``."""
+    recording = LandmarkRecording(path)
+    replayed = list(recording.frames())
+    if len(replayed) != len(expected):
+        return [f"{len(replayed)} frames replayed, expected {len(expected)}"]
+    problems = []
+    for i, ((_, hands), wanted) in enumerate(zip(replayed, expected)):
+        if len(hands) != len(wanted) or not all(np.array_equal(a.landmarks, b.landmarks) for a, b in zip(hands, wanted)):
+            problems.append(f"frame {i} differs")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=50)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        full = os.path.join(directory, 'take.mhl')
+        written = write_take(full, args.frames, np.random.default_rng(0))
+        size = os.path.getsize(full)
+        record_size = (size - HEADER_DTYPE.itemsize) // args.frames
+        cuts = [(size, len(written)), (HEADER_DTYPE.itemsize, 0)]
+        cuts += [(size - cut, len(written) - 1) for cut in range(1, record_size + 1)]
+        failures = 0
+        for length, frames in cuts:
+            path = os.path.join(directory, 'cut.mhl')
+            shutil.copyfile(full, path)
+            os.truncate(path, length)
+            problems = check(path, written[:frames])
+            if problems:
+                failures += 1
+                print(f"FAIL cut to {length} of {size} bytes: {'; '.join(problems[:3])}")
+    finally:
+        shutil.rmtree(directory)
+
+    print(f"{len(cuts) - failures} of {len(cuts)} truncated takes replayed correctly")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
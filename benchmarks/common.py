@@ -0,0 +1,111 @@
+"""Inputs shared by the benchmark scripts: frames from a video and generated hands."""
+import math
+
+import cv2
+import numpy as np
+
+from madhand.landmarks import Hand
+from madhand.preprocess import FramePreprocessor
+
+# Finger base direction in degrees from straight up, metacarpal and phalanx lengths (image heights)
+FINGER_SHAPES = (
+    (-55, 0.05, (0.06, 0.04, 0.035)),  # thumb: CMC to MCP, then MCP-IP, IP-tip
+    (-12, 0.16, (0.07, 0.04, 0.03)),
+    (0, 0.16, (0.075, 0.045, 0.03)),
+    (12, 0.15, (0.07, 0.04, 0.03)),
+    (24, 0.14, (0.055, 0.03, 0.025)),
+)
+
+
+def load_frames(path, upscale):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        success, image = cap.read()
+        if not success:
+            break
+        if upscale and image.shape[0] != upscale:
+            width = round(image.shape[1] * upscale / image.shape[0])
+            image = cv2.resize(image, (width, upscale))
+        frames.append(image)
+    cap.release()
+    if not frames:
+        raise SystemExit(f"Error: no frames read from {path}")
+    return frames
+
+
+def rgb_frames(frames):
+    preprocessor = FramePreprocessor()
+    return [preprocessor.process(image, preview=False)[0].copy() for image in frames]
+
+
+def synthetic_hand(curls, thumb_curl=0.0, roll=0.0, wrist=(0.5, 0.8), scale=1.0, noise=0.0, rng=None):
+    """``(21, 3)`` landmarks of an upright right hand facing the camera.
+
+    ``curls`` is the bend of index to little finger from 0 (straight) to 1 (a tight fist),
+    spread over their three joints; ``thumb_curl`` folds the thumb across the palm.
+    ``roll`` turns the hand in the image plane, in degrees.
+    """
+    landmarks = np.zeros((21, 3), dtype=np.float32)
+    landmarks[0, :2] = wrist
+    rotation = math.radians(roll)
+    for finger, (angle, metacarpal, phalanges) in enumerate(FINGER_SHAPES):
+        direction = math.radians(angle) + rotation
+        up = np.array([math.sin(direction), -math.cos(direction), 0.0])
+        base = 1 + 4 * finger
+        if finger == 0:
+            # The thumb folds in the image plane, towards the little finger
+            point = landmarks[0] + scale * metacarpal * up
+            landmarks[base] = point
+            theta = 0.0
+            for joint, length in enumerate(phalanges):
+                theta += thumb_curl * (0.3, 0.8, 0.6)[joint]
+                turned = direction + theta
+                step = np.array([math.sin(turned), -math.cos(turned), 0.0])
+                point = point + scale * length * step
+                landmarks[base + 1 + joint] = point
+            continue
+        # Fingers fold towards the camera and then back down the palm
+        toward = np.array([0.0, 0.0, -1.0])
+        point = landmarks[0] + scale * metacarpal * up
+        landmarks[base] = point
+        theta = 0.0
+        for joint, length in enumerate(phalanges):
+            theta += curls[finger - 1] * (1.5, 1.75, 1.1)[joint]
+            point = point + scale * length * (math.cos(theta) * up + math.sin(theta) * toward)
+            landmarks[base + 1 + joint] = point
+    if noise:
+        landmarks += (rng or np.random.default_rng()).normal(0, noise, landmarks.shape).astype(np.float32)
+    return landmarks
+
+
+def random_hands(count, rng):
+    hands = []
+    for _ in range(count):
+        curls = rng.uniform(0, 1, 4) if rng.random() < 0.5 else np.full(4, rng.choice([0.0, 1.0]))
+        hands.append(synthetic_hand(curls, rng.uniform(0, 1), rng.uniform(-40, 40),
+                                    (rng.uniform(0.3, 0.7), rng.uniform(0.6, 0.9)), rng.uniform(0.7, 1.3),
+                                    0.002, rng))
+    return hands
+
+
+def synthetic_take(seconds, fps, hands=1, seed=0):
+    """``(time, hands)`` frames of hands sweeping up and down, now and then closing into a fist.
+
+    Each hand moves on its own period, so notes change every few frames, like a
+    performance; the same ``seed`` gives the same take.
+    """
+    rng = np.random.default_rng(seed)
+    periods = rng.uniform(1.5, 4.0, hands)
+    frames = []
+    for i in range(int(seconds * fps)):
+        now = i / fps
+        found = []
+        for h in range(hands):
+            phase = 2 * math.pi * now / periods[h]
+            curl = 1.0 if math.sin(phase / 3) > 0.8 else 0.1
+            wrist = (0.3 + 0.4 * h / max(hands - 1, 1), 0.65 + 0.25 * math.sin(phase))
+            found.append(Hand(synthetic_hand([curl] * 4, 0.2, 10 * math.sin(phase), wrist, noise=0.002, rng=rng),
+                              ('Right', 'Left')[h % 2], 0.95))
+        frames.append((now, found))
+    return frames
@@ -0,0 +1,275 @@
+"""Per-stage benchmarks of the hand-to-MIDI pipeline, checked against a JSON baseline.
+
+Every case runs on generated frames and landmarks or on the bundled landmark take in
+``benchmarks/data``, with MIDI going to a null sink, so no camera, recording or MIDI
+device is needed. Each case is timed ``--repeat`` times and its median time per
+operation is compared with the baseline; a case slower than the baseline by more than
+its threshold (``--threshold``, or a per-case value in the baseline's ``thresholds``)
+is a regression and makes the run exit with status 1.
+
+Usage:
+    python benchmarks/suite.py                                  # compare with benchmarks/baseline.json if present
+    python benchmarks/suite.py --save benchmarks/baseline.json  # record a new baseline
+    python benchmarks/suite.py --baseline release.json --threshold 0.15 --only preprocess gestures
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from benchmarks.common import random_hands, synthetic_take
+from madhand.channels import ALL_CHANNELS
+from madhand.cli import NoteCounter, open_backend, run_frames, run_landmarks
+from madhand.controllers import Controllers
+from madhand.engine import EngineConfig, NoteEngine
+from madhand.filters import OneEuroFilter
+from madhand.gestures import GestureClassifier
+from madhand.midi import MidiDispatcher, NullSink
+from madhand.preprocess import FramePreprocessor
+from madhand.recording import LandmarkRecorder, LandmarkRecording
+from madhand.sources import SyntheticSource
+from madhand.timing import StageTimer
+
+CLIP = os.path.join(ROOT, 'benchmarks', 'data', 'take.mhl')
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+DEFAULT_THRESHOLD = 0.25
+CONFIG = EngineConfig(note_change_threshold=2, controllers=(('index_x', 'pitch_bend'), ('pinch', 74)))
+
+
+def make_clip(path=CLIP):
+    """Write the bundled take: 4 s of two generated hands at 30 fps."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    recorder = LandmarkRecorder(path, max_hands=2)
+    for now, hands in synthetic_take(4.0, 30.0, hands=2):
+        recorder.write(now, hands)
+    recorder.close()
+
+
+# Each case builds its inputs and returns ``(run, operations)``, optionally followed by a
+# function to call when done: ``run()`` does ``operations`` operations, and the time per
+# operation is what gets compared
+
+def case_preprocess():
+    source = SyntheticSource(1280, 720)
+    source.open()
+    frames = [source.read() for _ in range(8)]
+    preprocessor = FramePreprocessor()
+
+    def run():
+        for image in frames:
+            preprocessor.process(image)
+    return run, len(frames)
+
+
+def case_smoothing():
+    hands = [hand.landmarks for _, found in synthetic_take(2.0, 60.0) for hand in found]
+    smoothing = OneEuroFilter()
+
+    def run():
+        smoothing.reset()
+        for i, landmarks in enumerate(hands):
+            smoothing(landmarks, i / 60.0)
+    return run, len(hands)
+
+
+def case_hand_to_midi():
+    hands = random_hands(500, np.random.default_rng(0))
+    engine = NoteEngine(CONFIG, NoteCounter())
+
+    def run():
+        zone = -1
+        for landmarks in hands:
+            _, _, zone = engine.hand_to_midi(landmarks, zone)
+    return run, len(hands)
+
+
+def case_gestures():
+    hands = random_hands(500, np.random.default_rng(0))
+    classifier = GestureClassifier()
+
+    def run():
+        for landmarks in hands:
+            classifier.classify(landmarks)
+    return run, len(hands)
+
+
+def case_controllers():
+    hands = random_hands(500, np.random.default_rng(0))
+    controllers = Controllers(CONFIG.controllers, 1)
+    output = NoteCounter()
+
+    def run():
+        for landmarks in hands:
+            controllers.update(0, landmarks, output, None)
+    return run, len(hands)
+
+
+def case_note_decision():
+    frames = synthetic_take(4.0, 60.0, hands=2)
+
+    def run():
+        engine = NoteEngine(CONFIG, NoteCounter())
+        for now, hands in frames:
+            engine.process(hands, now)
+    return run, len(frames)
+
+
+def case_midi_fanout():
+    # A note change queued and sent on all 16 channels, what the MIDI thread does per wake-up
+    dispatcher = MidiDispatcher(NullSink(), ALL_CHANNELS)
+    changes = [(60 + i % 12, 61 + i % 12) for i in range(200)]
+
+    def run():
+        for old, new in changes:
+            dispatcher.note_off(old)
+            dispatcher.note_on(new, 100)
+            dispatcher.flush()
+    return run, len(changes)
+
+
+def case_replay_clip():
+    if not os.path.exists(CLIP):
+        make_clip()
+    recording = LandmarkRecording(CLIP)
+    # Started and stopped outside the timed runs, which would otherwise mostly time the thread's start-up and shutdown
+    dispatcher = MidiDispatcher(NullSink(), ALL_CHANNELS).start()
+
+    def run():
+        engine = NoteEngine(CONFIG, dispatcher)
+        run_landmarks(recording.frames(), engine, StageTimer())
+        engine.release()
+    return run, len(recording), dispatcher.stop
+
+
+def case_pipeline():
+    # Frames through preprocessing, hand tracking and the engine, like the headless runner
+    source = SyntheticSource(640, 360, fps=30.0)
+    source.open()
+    frames = [source.read() for _ in range(30)]
+    # Built once, since building and closing a Hands graph costs more than the frames it would time
+    backend, close = open_backend(CONFIG.max_num_hands)
+
+    def run():
+        run_frames(iter(frames), NoteEngine(CONFIG, NoteCounter()), StageTimer(), 30.0, backend)
+    return run, len(frames), close
+
+
+CASES = {
+    'preprocess': case_preprocess,
+    'smoothing': case_smoothing,
+    'hand_to_midi': case_hand_to_midi,
+    'gestures': case_gestures,
+    'controllers': case_controllers,
+    'note_decision': case_note_decision,
+    'midi_fanout': case_midi_fanout,
+    'replay_clip': case_replay_clip,
+    'pipeline': case_pipeline,
+}
+
+
+def measure(case, repeat):
+    run, operations, *close = case()
+    run()  # Warm up caches, buffers and lazily built models
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) / operations * 1e6)
+    for done in close:
+        done()
+    return {'median_us': statistics.median(times), 'min_us': min(times), 'operations': operations}
+
+
+def environment():
+    import cv2
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpus': os.cpu_count(),
+        'system': platform.platform(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline to compare with")
+    parser.add_argument('--save', metavar='PATH', help="write the results as a new baseline")
+    parser.add_argument('--threshold', type=float, help="allowed slowdown as a fraction, e.g. 0.25 for 25%%; "
+                        "overrides the baseline's default")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='+', choices=sorted(CASES), help="run only these cases")
+    parser.add_argument('--make-clip', action='store_true', help="regenerate the bundled landmark take and exit")
+    args = parser.parse_args()
+
+    if args.make_clip:
+        make_clip()
+        print(f"Wrote {CLIP}")
+        return
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('environment') != environment():
+            print(f"Note: {args.baseline} was recorded in a different environment; compare with care")
+    default_threshold = baseline.get('threshold', DEFAULT_THRESHOLD) if baseline else DEFAULT_THRESHOLD
+
+    results = {}
+    regressions = []
+    print(f"{'case':<14} {'median us':>10} {'min us':>10} {'baseline':>10} {'change':>8}")
+    for name in args.only or CASES:
+        try:
+            result = results[name] = measure(CASES[name], args.repeat)
+        except ImportError as e:
+            print(f"{name:<14} skipped: {e}")
+            continue
+        line = f"{name:<14} {result['median_us']:10.2f} {result['min_us']:10.2f}"
+        reference = baseline['results'].get(name) if baseline else None
+        if reference:
+            change = result['median_us'] / reference['median_us'] - 1
+            threshold = args.threshold
+            if threshold is None:
+                threshold = baseline.get('thresholds', {}).get(name, default_threshold)
+            line += f" {reference['median_us']:10.2f} {change * 100:+7.1f}%"
+            if change > threshold:
+                line += f"  REGRESSION (> {threshold * 100:.0f}%)"
+                regressions.append(name)
+        print(line)
+
+    if args.save:
+        previous = {}
+        if os.path.exists(args.save):
+            with open(args.save) as f:
+                previous = json.load(f)
+        # Per-case thresholds are set by hand and kept across re-recordings
+        saved = {
+            'environment': environment(),
+            'recorded': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'threshold': args.threshold if args.threshold is not None else default_threshold,
+            'thresholds': previous.get('thresholds', {}),
+            'results': dict(previous.get('results', {}), **results),
+        }
+        with open(args.save, 'w') as f:
+            json.dump(saved, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Saved baseline to {args.save}")
+    elif baseline is None:
+        print(f"No baseline at {args.baseline}; record one with --save {os.path.relpath(args.baseline)}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
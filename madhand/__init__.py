@@ -0,0 +1 @@
+"""Shared building blocks for the MadHand GUI and script front ends."""
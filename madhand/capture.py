@@ -0,0 +1,149 @@
+"""Camera capture on a dedicated thread with latest-frame-wins hand-off."""
+import collections
+import threading
+import time
+
+from .sources import CaptureFormat, FrameSource, create_source
+
+
+class Frame:
+    __slots__ = ('image', 'seq', 'timestamp')
+
+    def __init__(self, image, seq, timestamp):
+        self.image = image
+        self.seq = seq
+        self.timestamp = timestamp
+
+
+class FrameGrabber:
+    """Reads frames from a ``FrameSource`` into a small ring buffer.
+
+    ``source`` may also be a camera index, video path, image directory or
+    ``'synthetic'``, opened through ``create_source`` with ``capture_format``
+    (by default ``fps`` with a one-frame driver buffer). The consumer always receives
+    the newest frame; frames it never got to are counted as dropped instead of piling
+    up in the driver's buffer.
+    """
+
+    def __init__(self, source, buffer_size=2, fps=60, realtime=None, capture_format=None):
+        if not isinstance(source, FrameSource):
+            source = create_source(source, capture_format or CaptureFormat(fps=fps, buffer_size=1))
+        self.source = source
+        self.fps = fps
+        # Sources a device does not pace are paced to their native rate by default so they behave like a camera
+        self.realtime = not source.live if realtime is None else realtime
+        self._frames = collections.deque(maxlen=buffer_size)
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._last_seq = 0
+        self.captured = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.empty_reads = 0
+        self.first_time = None
+        self.last_time = None
+        self.finished = False
+
+    def open(self):
+        if not self.source.open():
+            self.source.close()
+            return False
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='FrameGrabber', daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self):
+        interval = 0.0
+        if self.realtime:
+            native_fps = self.source.granted.fps
+            interval = 1.0 / (native_fps if native_fps and native_fps > 0 else self.fps)
+        next_time = time.perf_counter()
+
+        while self._running:
+            image = self.source.read()
+            now = time.perf_counter()
+            if image is None:
+                if self.source.finite:
+                    break
+                self.empty_reads += 1
+                continue
+
+            with self._cond:
+                self.captured += 1
+                self._frames.append(Frame(image, self.captured, now))
+                self._cond.notify()
+            if self.first_time is None:
+                self.first_time = now
+            self.last_time = now
+
+            if interval:
+                next_time += interval
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_time = time.perf_counter()
+
+        with self._cond:
+            self.finished = True
+            self._cond.notify_all()
+
+    def capture_fps(self):
+        """Frames per second actually delivered by the source, whatever it reported."""
+        if self.captured < 2 or self.last_time <= self.first_time:
+            return 0.0
+        return (self.captured - 1) / (self.last_time - self.first_time)
+
+    def _has_new_frame(self):
+        return bool(self._frames) and self._frames[-1].seq > self._last_seq
+
+    def read(self, timeout=0.5):
+        """Return the newest unseen frame, or None on timeout or end of stream."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._has_new_frame() or self.finished, timeout)
+            if not self._has_new_frame():
+                return None
+            frame = self._frames[-1]
+            self.dropped += frame.seq - self._last_seq - 1
+            self._last_seq = frame.seq
+            self.delivered += 1
+            return frame
+
+    def drop_rate(self):
+        seen = self.delivered + self.dropped
+        return self.dropped / seen if seen else 0.0
+
+    def close(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.source.close()
+
+
+class LatencyStats:
+    """Running capture-to-note latency figures, in seconds."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def record(self, capture_time):
+        latency = time.perf_counter() - capture_time
+        self.count += 1
+        self.total += latency
+        if latency > self.worst:
+            self.worst = latency
+        return latency
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self, grabber):
+        return (f"Captured {grabber.captured} frames at {grabber.capture_fps():.1f} fps, dropped {grabber.dropped} "
+                f"({grabber.drop_rate() * 100:.1f}%), capture-to-note latency "
+                f"avg {self.mean() * 1000:.1f} ms, max {self.worst * 1000:.1f} ms over {self.count} notes")
@@ -0,0 +1,19 @@
+"""MIDI channel masks: bit n set sends on channel n (0-15). Free of heavy imports, so the GUI can load it at launch."""
+
+ALL_CHANNELS = 0xFFFF
+
+
+def channel_mask(channels):
+    mask = 0
+    for channel in channels:
+        mask |= 1 << channel
+    return mask
+
+
+def mask_channels(mask):
+    return tuple(channel for channel in range(16) if mask >> channel & 1)
+
+
+def voice_masks(channels, count):
+    """Channel mask for each of ``count`` voices, cycling through ``channels`` (0-15)."""
+    return [1 << channels[i % len(channels)] for i in range(count)]
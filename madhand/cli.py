@@ -0,0 +1,304 @@
+"""Headless runner: feeds frames or landmarks through the engine without a camera, window or MIDI device.
+
+Examples:
+    python -m madhand --video take.mp4
+    python -m madhand --images frames/ --sink notes.txt
+    python -m madhand --synthetic 300 --size 1280x720 --idle
+    python -m madhand --landmarks take.npy --fps 60
+    python -m madhand --video take.mp4 --record-landmarks take.mhl
+    python -m madhand --landmarks take.mhl --control-fps 120
+    python -m madhand --landmarks take.mhl --sweep-threshold 2 4 6 8 --sweep-cutoff 0.5 1 2
+"""
+import argparse
+import dataclasses
+import itertools
+import os
+import time
+
+import numpy as np
+
+from .channels import channel_mask, voice_masks
+from .engine import EngineConfig, NoteEngine
+from .idle import IdleScheduler
+from .landmarks import Hand
+from .controllers import PITCH_BEND, SOURCES
+from .mapping import NOTE_NAMES, SCALES
+from .midi import FileSink, MidiDispatcher, NullSink
+from .midifile import MidiRecorder
+from .recording import LandmarkRecorder, LandmarkRecording
+from .sources import ImageSequenceSource, SyntheticSource, VideoFileSource, parse_size
+from .timing import StageTimer
+
+
+def source_frames(source, name):
+    """Every frame of a finite ``FrameSource``, as fast as it can be read."""
+    if not source.open():
+        raise SystemExit(f"Error: Could not open {name}")
+    try:
+        yield from source
+    finally:
+        source.close()
+
+
+def landmark_frames(path, fps):
+    """Yield ``(time, hands)`` from a landmark recording or a ``(frames, 21, 3)`` .npy array.
+
+    In the .npy form a frame without a hand is all NaN and frames are ``1 / fps`` apart.
+    """
+    if not path.endswith('.npy'):
+        yield from LandmarkRecording(path).frames()
+        return
+
+    data = np.load(path, mmap_mode='r')
+    if data.ndim != 3 or data.shape[1:] != (21, 3):
+        raise SystemExit(f"Error: {path} must hold a (frames, 21, 3) array, got {data.shape}")
+    for i, landmarks in enumerate(data):
+        landmarks = np.asarray(landmarks, dtype=np.float32)
+        yield i / fps, [] if np.isnan(landmarks[0, 0]) else [Hand(landmarks, 'Unknown', 1.0)]
+
+
+class NoteCounter:
+    """Engine output that only counts notes, for parameter sweeps."""
+
+    def __init__(self):
+        self.note_ons = 0
+        self.note_offs = 0
+
+    def note_on(self, note, velocity, mask=None):
+        self.note_ons += 1
+
+    def note_off(self, note, mask=None):
+        self.note_offs += 1
+
+    def control_change(self, controller, value, mask=None):
+        pass
+
+    def pitch_bend(self, value, mask=None):
+        pass
+
+
+def open_backend(max_num_hands, workers=1, tasks_model=None):
+    """Build a hand tracking backend; returns ``(backend, close)``, where ``close`` also closes any model it built."""
+    import mediapipe as mp
+    from .inference import SolutionsBackend, TasksBackend
+    from .parallel import ParallelInference
+
+    if tasks_model:
+        backend = TasksBackend(tasks_model, max_num_hands)
+        return backend, backend.close
+    if workers > 1:
+        backend = ParallelInference(workers, max_num_hands=max_num_hands)
+        return backend, backend.close
+    hands_model = mp.solutions.hands.Hands(max_num_hands=max_num_hands, min_detection_confidence=0.7,
+                                           min_tracking_confidence=0.7)
+    backend = SolutionsBackend(hands_model)
+
+    def close():
+        backend.close()
+        hands_model.close()
+    return backend, close
+
+
+def run_frames(frames, engine, timer, fps, backend, recorder=None, idle=None):
+    from .preprocess import FramePreprocessor
+    from .inference import wait_idle
+
+    def handle(results):
+        for timestamp, hands in results:
+            if idle is not None:
+                idle.update(hands, timestamp)
+            if recorder is not None:
+                start = time.perf_counter()
+                recorder.write(timestamp, hands)
+                timer.add('record', start)
+
+            start = time.perf_counter()
+            engine.process(hands, timestamp)
+            timer.add('engine', start)
+
+    preprocessor = FramePreprocessor()
+    count = 0
+    start = began = time.perf_counter()
+    for image in frames:
+        timer.add('decode', start)
+
+        start = time.perf_counter()
+        rgb, _ = preprocessor.process(image, preview=False)
+        timer.add('preprocess', start)
+
+        start = time.perf_counter()
+        # Wait until the backend would neither skip nor refuse the frame, so every frame is tracked
+        results = []
+        if idle is None or idle.should_infer(rgb, count / fps):
+            results += backend.drain()
+            while not backend.submit(rgb, count / fps):
+                results += backend.poll(timeout=1.0)
+        results += backend.poll()
+        timer.add('inference', start)
+
+        handle(results)
+        count += 1
+        start = time.perf_counter()
+
+    handle(wait_idle(backend))
+    elapsed = time.perf_counter() - began
+    return count, elapsed
+
+
+def run_landmarks(frames, engine, timer, control_fps=None):
+    count = 0
+    next_tick = None
+    began = start = time.perf_counter()
+    for count, (timestamp, hands) in enumerate(frames, 1):
+        timer.add('load', start)
+
+        if control_fps:
+            # Fill the gap since the previous frame with predicted control updates
+            start = time.perf_counter()
+            while next_tick is not None and next_tick < timestamp:
+                engine.tick(next_tick)
+                next_tick += 1 / control_fps
+            next_tick = timestamp + 1 / control_fps
+            timer.add('predict', start)
+
+        start = time.perf_counter()
+        engine.process(hands, timestamp)
+        timer.add('engine', start)
+        start = time.perf_counter()
+    return count, time.perf_counter() - began
+
+
+def sweep(args, base_config):
+    thresholds = args.sweep_threshold or [base_config.note_change_threshold]
+    cutoffs = args.sweep_cutoff or [base_config.filter_min_cutoff]
+    betas = args.sweep_beta or [base_config.filter_beta]
+    print(f"{'threshold':>9} {'cutoff':>6} {'beta':>6} {'notes':>6} {'notes/min':>9} {'seconds':>8}")
+    for threshold, cutoff, beta in itertools.product(thresholds, cutoffs, betas):
+        config = dataclasses.replace(base_config, note_change_threshold=threshold,
+                                     filter_min_cutoff=cutoff, filter_beta=beta)
+        counter = NoteCounter()
+        engine = NoteEngine(config, counter)
+        start = time.perf_counter()
+        duration = 0.0
+        for duration, hands in landmark_frames(args.landmarks, args.fps):
+            engine.process(hands, duration)
+        elapsed = time.perf_counter() - start
+        per_minute = counter.note_ons / duration * 60 if duration else 0.0
+        print(f"{threshold:>9} {cutoff:>6} {beta:>6} {counter.note_ons:>6} {per_minute:>9.1f} {elapsed:>8.3f}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m madhand', description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--video', help="video file to run hand tracking on")
+    source.add_argument('--images', help="directory of images to run hand tracking on, in name order")
+    source.add_argument('--landmarks', help="landmark recording, or .npy file of (frames, 21, 3) landmarks, "
+                                            "to replay without hand tracking")
+    source.add_argument('--synthetic', type=int, metavar='FRAMES', help="run hand tracking on this many generated "
+                        "frames, to benchmark the pipeline without a camera or recording")
+    parser.add_argument('--sink', default='null', help="'null' to discard MIDI, or a path to log messages to")
+    parser.add_argument('--fps', type=float, default=30.0, help="frame rate used for engine timestamps")
+    parser.add_argument('--size', type=parse_size, default=(640, 360), metavar='WxH', help="size of --synthetic frames")
+    parser.add_argument('--min-note', type=int, default=EngineConfig.min_note)
+    parser.add_argument('--max-note', type=int, default=EngineConfig.max_note)
+    parser.add_argument('--filter-cutoff', type=float, default=EngineConfig.filter_min_cutoff)
+    parser.add_argument('--filter-beta', type=float, default=EngineConfig.filter_beta)
+    parser.add_argument('--threshold', type=int, default=EngineConfig.note_change_threshold)
+    parser.add_argument('--scale', choices=sorted(SCALES), default=EngineConfig.scale)
+    parser.add_argument('--root', choices=NOTE_NAMES, default=NOTE_NAMES[EngineConfig.root], help="scale root")
+    parser.add_argument('--hysteresis', type=float, default=EngineConfig.hysteresis,
+                        help="how far past a note's zone, as a fraction of its height, the hand must move to change it")
+    parser.add_argument('--max-hands', type=int, default=EngineConfig.max_num_hands)
+    parser.add_argument('--pitch-bend', choices=sorted(SOURCES), help="stream pitch bend from this hand measure")
+    parser.add_argument('--cc', nargs=2, action='append', default=[], metavar=('SOURCE', 'NUMBER'),
+                        help=f"stream a control change from a hand measure ({', '.join(sorted(SOURCES))}); repeatable")
+    parser.add_argument('--control-rate', type=float, default=100.0,
+                        help="most controller messages per second per controller and channel")
+    parser.add_argument('--deadband', type=int, default=1, help="smallest controller change sent, in CC steps")
+    parser.add_argument('--channels', type=int, nargs='+', default=[0, 1],
+                        help="MIDI channel 0-15 for each hand's voice, reused in turn if there are more hands")
+    parser.add_argument('--workers', type=int, default=1, help="run hand tracking in this many processes")
+    parser.add_argument('--tasks-model', metavar='PATH', help="track hands with the MediaPipe Tasks landmarker "
+                        "from this hand_landmarker.task bundle")
+    parser.add_argument('--control-fps', type=float, help="with --landmarks, add predicted control updates "
+                        "between recorded frames at this rate")
+    parser.add_argument('--idle', action='store_true', help="after a stretch without hands, only track frames "
+                        "with motion or twice a second, and report the CPU time saved")
+    parser.add_argument('--record-landmarks', metavar='PATH', help="save the tracked landmarks to a recording")
+    parser.add_argument('--record-midi', metavar='PATH', help="save the MIDI output to a .mid file, timed as sent")
+    parser.add_argument('--sweep-threshold', type=int, nargs='+', help="replay --landmarks once per threshold")
+    parser.add_argument('--sweep-cutoff', type=float, nargs='+', help="replay --landmarks once per filter cutoff")
+    parser.add_argument('--sweep-beta', type=float, nargs='+', help="replay --landmarks once per filter beta")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    # Options that would otherwise be silently ignored
+    if args.record_landmarks and args.landmarks:
+        parser.error("--record-landmarks records tracked frames and cannot be used with --landmarks")
+    if args.tasks_model and args.workers > 1:
+        parser.error("--tasks-model runs its own thread and cannot be used with --workers")
+    controllers = [(source, int(number)) for source, number in args.cc]
+    if args.pitch_bend:
+        controllers.append((args.pitch_bend, PITCH_BEND))
+    config = EngineConfig(min_note=args.min_note, max_note=args.max_note, filter_min_cutoff=args.filter_cutoff,
+                          filter_beta=args.filter_beta, note_change_threshold=args.threshold,
+                          scale=args.scale, root=NOTE_NAMES.index(args.root), hysteresis=args.hysteresis,
+                          controllers=tuple(controllers), max_num_hands=args.max_hands)
+    if args.sweep_threshold or args.sweep_cutoff or args.sweep_beta:
+        if not args.landmarks:
+            raise SystemExit("Error: parameter sweeps replay --landmarks")
+        sweep(args, config)
+        return
+
+    if args.tasks_model and not os.path.exists(args.tasks_model):
+        raise SystemExit(f"Error: no model bundle at {args.tasks_model}")
+
+    sink = NullSink() if args.sink == 'null' else FileSink(args.sink)
+    dispatcher = MidiDispatcher(sink, channel_mask(args.channels), control_rate=args.control_rate,
+                                deadband=args.deadband).start()
+    midi_recorder = MidiRecorder(args.record_midi).start() if args.record_midi else None
+    dispatcher.recorder = midi_recorder
+    engine = NoteEngine(config, dispatcher, voice_masks=voice_masks(args.channels, args.max_hands))
+    timer = StageTimer()
+
+    idle = IdleScheduler() if args.idle else None
+    recorder = LandmarkRecorder(args.record_landmarks, args.max_hands) if args.record_landmarks else None
+    if args.landmarks:
+        frames, elapsed = run_landmarks(landmark_frames(args.landmarks, args.fps), engine, timer, args.control_fps)
+    else:
+        if args.video:
+            source, name = VideoFileSource(args.video), f"video {args.video}"
+        elif args.images:
+            source, name = ImageSequenceSource(args.images, args.fps), f"images in {args.images}"
+        else:
+            source, name = SyntheticSource(*args.size, fps=args.fps, frames=args.synthetic), "synthetic frames"
+        close_backend = None
+        try:
+            backend, close_backend = open_backend(args.max_hands, args.workers, args.tasks_model)
+            frames, elapsed = run_frames(source_frames(source, name), engine, timer, args.fps, backend, recorder, idle)
+        except RuntimeError as e:
+            raise SystemExit(f"Error: {e}")
+        finally:
+            if close_backend is not None:
+                close_backend()
+    if recorder is not None:
+        recorder.close()
+
+    engine.release()
+    dispatcher.stop()
+    sink.close()
+    if midi_recorder is not None:
+        midi_recorder.stop()
+    print(timer.report(frames, elapsed))
+    if idle is not None:
+        print(idle.summary())
+    print(f"MIDI: {dispatcher.sent} messages sent, {dispatcher.coalesced} redundant events coalesced")
+    if midi_recorder is not None:
+        print(f"Recorded {midi_recorder.recorded} messages to {args.record_midi}, {midi_recorder.dropped} dropped")
+
+
+if __name__ == '__main__':
+    main()
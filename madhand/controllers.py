@@ -0,0 +1,63 @@
+"""Continuous controllers (CC and pitch bend) driven by hand shape and position."""
+import math
+
+import numpy as np
+
+from .landmarks import INDEX_TIP, THUMB_TIP
+
+WRIST = 0
+MIDDLE_MCP = 9
+PITCH_BEND = 'pitch_bend'
+
+
+def _pinch(landmarks):
+    # Thumb-index gap relative to palm length, so it does not depend on distance to the camera
+    palm = math.hypot(*(landmarks[MIDDLE_MCP, :2] - landmarks[WRIST, :2]).tolist()) or 1.0
+    gap = math.hypot(*(landmarks[INDEX_TIP, :2] - landmarks[THUMB_TIP, :2]).tolist())
+    return (gap / palm - 0.2) / 1.3
+
+
+# Each source maps landmarks to 0..1
+SOURCES = {
+    'index_x': lambda landmarks: float(landmarks[INDEX_TIP, 0]),
+    'hand_x': lambda landmarks: float(landmarks[WRIST, 0]),
+    'hand_y': lambda landmarks: 1.0 - float(landmarks[WRIST, 1]),
+    'pinch': _pinch,
+}
+
+
+class Controllers:
+    """Per-voice controller streams from ``mappings`` of ``(source, target)`` pairs.
+
+    ``source`` is a name from ``SOURCES``; ``target`` is a CC number or ``'pitch_bend'``.
+    Only values that differ from the voice's last one are passed on to the output's
+    ``control_change(number, value, mask)`` and ``pitch_bend(value, mask)``; deadband and
+    rate limiting are left to the ``MidiDispatcher``.
+    """
+
+    def __init__(self, mappings, size):
+        for source, target in mappings:
+            if source not in SOURCES:
+                raise ValueError(f"Unknown controller source: {source}")
+            if target != PITCH_BEND and not 0 <= target <= 127:
+                raise ValueError(f"Controller target must be a CC number 0-127 or '{PITCH_BEND}': {target}")
+        self.mappings = [(SOURCES[source], target) for source, target in mappings]
+        self.last = np.full((size, len(mappings)), -100000, dtype=np.int32)
+
+    def update(self, slot, landmarks, output, mask):
+        last = self.last[slot]
+        for i, (source, target) in enumerate(self.mappings):
+            value = min(max(source(landmarks), 0.0), 1.0)
+            if target == PITCH_BEND:
+                value = int(round(value * 16383)) - 8192
+                if value != last[i]:
+                    last[i] = value
+                    output.pitch_bend(value, mask)
+            else:
+                value = int(round(value * 127))
+                if value != last[i]:
+                    last[i] = value
+                    output.control_change(target, value, mask)
+
+    def reset(self, slot):
+        self.last[slot] = -100000
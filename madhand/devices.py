@@ -0,0 +1,61 @@
+"""Discovery of cameras and MIDI outputs, with the camera list cached between launches."""
+import json
+import os
+import threading
+
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.madhand', 'cameras.json')
+
+# Held while a camera is being opened, so probing never races the capture thread for a device
+CAMERA_LOCK = threading.Lock()
+
+
+def probe_cameras(max_index=5):
+    """Try camera indices ``0..max_index-1``; returns ``{'index', 'width', 'height'}`` per working one."""
+    import cv2
+
+    cameras = []
+    for index in range(max_index):
+        with CAMERA_LOCK:
+            cap = cv2.VideoCapture(index)
+            try:
+                if cap.isOpened():
+                    cameras.append({
+                        'index': index,
+                        'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                        'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                    })
+            finally:
+                cap.release()
+    return cameras
+
+
+def midi_output_names():
+    import mido
+
+    try:
+        return mido.get_output_names()
+    except Exception:
+        return []
+
+
+def load_camera_cache(path=CACHE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_camera_cache(cameras, path=CACHE_PATH):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(cameras, f)
+    except OSError:
+        pass
+
+
+def camera_label(camera):
+    if camera.get('width'):
+        return f"Camera {camera['index']} ({camera['width']}x{camera['height']})"
+    return f"Camera {camera['index']}"
@@ -0,0 +1,188 @@
+"""Gesture-to-note logic shared by every front end, free of camera, UI and MIDI port code."""
+from dataclasses import dataclass
+
+import numpy as np
+
+from .controllers import Controllers
+from .filters import OneEuroFilter
+from .gestures import DEFAULT_GESTURES, GestureClassifier
+from .landmarks import INDEX_TIP, THUMB_TIP
+from .mapping import NoteMap
+from .voices import VoiceTable
+
+
+@dataclass(frozen=True)
+class EngineConfig:
+    min_note: int = 21  # A0 (lowest note on a standard piano)
+    max_note: int = 108  # C8 (highest note on a standard piano)
+    filter_min_cutoff: float = 1.0  # Hz; lower smooths a still hand more
+    filter_beta: float = 2.0  # How quickly smoothing backs off as the hand speeds up
+    note_change_threshold: int = 6
+    scale: str = 'chromatic'  # A name from mapping.SCALES
+    root: int = 0  # Scale root as a pitch class, 0 = C
+    hysteresis: float = 0.25  # Fraction of a zone's height the hand must move past it to change note
+    zones: tuple = ()  # Custom (top, bottom, note[, hysteresis]) zones, replacing the scale
+    controllers: tuple = ()  # (source, CC number or 'pitch_bend') pairs, see controllers.SOURCES
+    gestures: tuple = DEFAULT_GESTURES  # gestures.Gesture tuples to recognise, the first match winning
+    hold_gesture: str = 'fist'  # Gesture that holds the note, a name from ``gestures``
+    release_delay: float = 0.1  # Seconds without a hand before the note is released
+    max_num_hands: int = 2
+
+
+def mapping_key(config):
+    """The settings a ``NoteMap`` is built from."""
+    return config.min_note, config.max_note, config.scale, config.root, config.hysteresis, config.zones
+
+
+class NoteEngine:
+    """Turns hand landmarks into note on/off calls on ``output``.
+
+    ``output`` is anything with ``note_on(note, velocity, mask)`` and ``note_off(note, mask)``,
+    usually a ``MidiDispatcher``; with ``config.controllers`` it also needs
+    ``control_change(number, value, mask)`` and ``pitch_bend(value, mask)``.
+    ``events`` is an optional ``EventLog``.
+
+    Each hand gets its own voice, with its own filter, note and gesture hold, and sends on
+    its own channel mask from ``voice_masks`` (None uses the output's default channels).
+    Landmarks are smoothed with a One Euro filter before they are quantised to notes
+    through a ``NoteMap``, rebuilt only when the note mapping settings change.
+    ``process`` takes each inference result; ``tick`` can be called in between to keep
+    producing updates from the filters' predictions, so inference may run below the
+    control rate. ``configure`` applies new settings without a restart.
+    """
+
+    def __init__(self, config, output, events=None, voice_masks=None):
+        self.config = config
+        self.output = output
+        self.events = events
+        self.voices = VoiceTable(config.max_num_hands)
+        self.voice_masks = list(voice_masks) if voice_masks else [None] * config.max_num_hands
+        self.filters = [OneEuroFilter(config.filter_min_cutoff, config.filter_beta)
+                        for _ in range(config.max_num_hands)]
+        self.note_map = NoteMap.from_config(config)
+        self.controllers = Controllers(config.controllers, config.max_num_hands) if config.controllers else None
+        self.gestures = GestureClassifier(config.gestures)
+        self.hold_gesture = self._hold_index(self.gestures, config)
+
+    def _hold_index(self, gestures, config):
+        index = gestures.index(config.hold_gesture)
+        if index < 0:
+            raise ValueError(f"Unknown hold gesture: {config.hold_gesture}")
+        return index
+
+    def configure(self, config):
+        """Switch to ``config`` between frames, keeping the voices and filter state.
+
+        Sounding notes carry on until the hand next moves far enough to change them.
+        ``max_num_hands`` sizes the voice table and cannot change here.
+        """
+        if config.max_num_hands != self.config.max_num_hands:
+            raise ValueError("max_num_hands cannot change on a running engine")
+        # Everything that can reject the config is built first, so a bad one changes nothing
+        gestures = GestureClassifier(config.gestures) if config.gestures != self.config.gestures else self.gestures
+        hold_gesture = self._hold_index(gestures, config)
+        note_map = NoteMap.from_config(config) if mapping_key(config) != mapping_key(self.config) else None
+        controllers = self.controllers
+        if config.controllers != self.config.controllers:
+            controllers = Controllers(config.controllers, config.max_num_hands) if config.controllers else None
+        for f in self.filters:
+            f.min_cutoff = config.filter_min_cutoff
+            f.beta = config.filter_beta
+        if note_map is not None:
+            self.note_map = note_map
+            # Zone indices refer to the old map
+            self.voices.zone[:] = -1
+        if gestures is not self.gestures:
+            self.gestures = gestures
+            # Gesture indices refer to the old set
+            self.voices.gesture[:] = -1
+        self.controllers = controllers
+        self.hold_gesture = hold_gesture
+        self.config = config
+
+    def hand_to_midi(self, landmarks, zone=-1):
+        """Returns ``(note, velocity, zone)``; ``zone`` is that of the sounding note, for hysteresis."""
+        note_map = self.note_map
+        # Index finger tip height picks the note, thumb tip height the velocity
+        zone = note_map.zone(float(landmarks[INDEX_TIP, 1]), zone)
+        return note_map.notes[zone], note_map.velocity(float(landmarks[THUMB_TIP, 1])), zone
+
+    def process(self, hands, now):
+        """Update from one inference result, a list of ``Hand``; returns True if a new note was started."""
+        voices = self.voices
+        started = False
+        for hand, slot in zip(hands, voices.assign(hands)):
+            if slot >= 0:
+                started |= self._update(slot, self.filters[slot](hand.landmarks, now), now)
+
+        for slot in voices.active():
+            if voices.seen[slot]:
+                continue
+            self.filters[slot].reset()
+            note = int(voices.note[slot])
+            if note < 0:
+                self._free(slot)
+            elif now - voices.last_time[slot] > self.config.release_delay:
+                self.output.note_off(note, self.voice_masks[slot])
+                if self.events is not None:
+                    self.events.info('note_off', "Sent Note Off (no hand): {} on voice {}", note, slot)
+                self._free(slot)
+
+        return started
+
+    def tick(self, now):
+        """Update the hands seen in the last inference from their predicted positions."""
+        started = False
+        for slot in np.flatnonzero(self.voices.seen):
+            started |= self._update(slot, self.filters[slot].predict(now), now)
+        return started
+
+    def _update(self, slot, landmarks, now):
+        events = self.events
+        voices = self.voices
+        gesture = self.gestures.classify(landmarks)
+        hold = gesture == self.hold_gesture
+        if events is not None and gesture != voices.gesture[slot]:
+            events.debug('gesture', "Gesture: {} on voice {}", self.gestures.names[gesture] if gesture >= 0 else "none", slot)
+        voices.gesture[slot] = gesture
+        # Controllers keep following the hand while a note is held
+        if self.controllers is not None:
+            self.controllers.update(slot, landmarks, self.output, self.voice_masks[slot])
+        if events is not None:
+            if hold:
+                events.debug('fist', "Fist detected, holding note")
+            else:
+                events.debug('open_hand', "Hand open, ready to change note")
+
+        note, velocity, zone = self.hand_to_midi(landmarks, int(voices.zone[slot]))
+        if events is not None:
+            events.debug('smoothed_note', "Smoothed note: {}, velocity: {}", note, velocity)
+
+        last_note = int(voices.note[slot])
+        if hold or (last_note >= 0 and abs(note - last_note) < self.config.note_change_threshold):
+            return False
+
+        mask = self.voice_masks[slot]
+        if last_note >= 0:
+            self.output.note_off(last_note, mask)
+            if events is not None:
+                events.info('note_off', "Sent Note Off: {} on voice {}", last_note, slot)
+        self.output.note_on(note, velocity, mask)
+        if events is not None:
+            events.info('note_on', "Sent Note On: {}, Velocity: {} on voice {}", note, velocity, slot)
+        voices.note[slot] = note
+        voices.zone[slot] = zone
+        voices.last_time[slot] = now
+        return True
+
+    def release(self):
+        for slot in self.voices.active():
+            note = int(self.voices.note[slot])
+            if note >= 0:
+                self.output.note_off(note, self.voice_masks[slot])
+            self._free(slot)
+
+    def _free(self, slot):
+        self.voices.free(slot)
+        if self.controllers is not None:
+            self.controllers.reset(slot)
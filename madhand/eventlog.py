@@ -0,0 +1,54 @@
+"""Bounded, typed event log that a UI drains in batches."""
+import collections
+import logging
+import time
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+
+class EventLog:
+    """Ring buffer of ``(time, level, kind, format, args)`` events plus per-kind counters.
+
+    Producers only append; formatting is deferred until ``drain`` so events that are
+    never shown cost a tuple, not a string. Every event is counted, whatever its level.
+    """
+
+    def __init__(self, capacity=500, level=INFO):
+        self.level = level
+        self.counters = collections.Counter()
+        self.overflowed = 0
+        self._events = collections.deque(maxlen=capacity)
+
+    def emit(self, level, kind, fmt, *args):
+        self.counters[kind] += 1
+        if level < self.level:
+            return
+        if len(self._events) == self._events.maxlen:
+            self.overflowed += 1
+        self._events.append((time.time(), level, kind, fmt, args))
+
+    def debug(self, kind, fmt, *args):
+        self.emit(DEBUG, kind, fmt, *args)
+
+    def info(self, kind, fmt, *args):
+        self.emit(INFO, kind, fmt, *args)
+
+    def warning(self, kind, fmt, *args):
+        self.emit(WARNING, kind, fmt, *args)
+
+    def error(self, kind, fmt, *args):
+        self.emit(ERROR, kind, fmt, *args)
+
+    def drain(self):
+        """Return pending events as ``(time, level, kind, message)``, oldest first."""
+        events = []
+        while self._events:
+            timestamp, level, kind, fmt, args = self._events.popleft()
+            events.append((timestamp, level, kind, fmt.format(*args) if args else fmt))
+        return events
+
+    def summary(self):
+        return ", ".join(f"{kind}: {count}" for kind, count in sorted(self.counters.items()))
@@ -0,0 +1,72 @@
+"""Adaptive low-pass filtering of landmark coordinates, with short-term prediction."""
+import math
+
+import numpy as np
+
+
+def smoothing_factor(dt, cutoff):
+    r = 2 * math.pi * cutoff * dt
+    return r / (r + 1)
+
+
+class OneEuroFilter:
+    """One Euro filter (Casiez et al., 2012) applied element-wise to a landmark array.
+
+    Slow movements are smoothed with a cutoff near ``min_cutoff`` Hz; the cutoff rises
+    with speed by ``beta`` so fast movements are followed with little lag. The filtered
+    velocity also lets ``predict`` extrapolate between inference frames.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=2.0, d_cutoff=1.0, max_prediction=0.05):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.max_prediction = max_prediction
+        self.value = None
+        self.velocity = None
+        self.last_time = None
+        self._predicted = None
+        self._scratch = None
+
+    def reset(self):
+        self.value = None
+        self.last_time = None
+
+    def __call__(self, x, t):
+        """Filter sample ``x`` taken at time ``t`` (seconds); returns the filter's own buffer."""
+        if self.value is None or self.value.shape != x.shape:
+            self.value = np.array(x, dtype=np.float32)
+            self.velocity = np.zeros_like(self.value)
+            self._predicted = np.empty_like(self.value)
+            self._scratch = np.empty_like(self.value)
+            self.last_time = t
+            return self.value
+
+        dt = t - self.last_time
+        if dt <= 0:
+            return self.value
+        self.last_time = t
+
+        scratch = self._scratch
+        # Low-pass the speed, then use it to pick a per-coordinate cutoff
+        np.subtract(x, self.value, out=scratch)
+        scratch /= dt
+        self.velocity += smoothing_factor(dt, self.d_cutoff) * (scratch - self.velocity)
+
+        np.abs(self.velocity, out=scratch)
+        scratch *= self.beta
+        scratch += self.min_cutoff
+        # alpha = r / (r + 1) with r = 2 pi cutoff dt
+        scratch *= 2 * math.pi * dt
+        scratch /= scratch + 1
+        self.value += scratch * (x - self.value)
+        return self.value
+
+    def predict(self, t):
+        """Extrapolate the filtered value to time ``t``, at most ``max_prediction`` seconds ahead."""
+        if self.value is None:
+            return None
+        ahead = min(max(t - self.last_time, 0.0), self.max_prediction)
+        np.multiply(self.velocity, ahead, out=self._predicted)
+        self._predicted += self.value
+        return self._predicted
@@ -0,0 +1,120 @@
+"""Hand gestures recognised from joint angles and pinch, with every gesture matched in one lookup."""
+import collections
+
+import numpy as np
+
+from .landmarks import INDEX_TIP, NUM_LANDMARKS, THUMB_TIP
+
+# Wrist followed by the four joints of thumb, index, middle, ring and little finger
+FINGER_CHAINS = ((0, 1, 2, 3, 4), (0, 5, 6, 7, 8), (0, 9, 10, 11, 12), (0, 13, 14, 15, 16), (0, 17, 18, 19, 20))
+
+# Finger states in a gesture's ``fingers``
+ANY = -1
+CURLED = 0
+EXTENDED = 1
+
+# ``fingers`` gives a state per finger, thumb first; ``pinch`` is True, False or None for either
+Gesture = collections.namedtuple('Gesture', 'name fingers pinch')
+
+# Checked in order; the first match wins
+DEFAULT_GESTURES = (
+    Gesture('fist', (ANY, CURLED, CURLED, CURLED, CURLED), None),
+    Gesture('pinch', (ANY, ANY, ANY, ANY, ANY), True),
+    Gesture('pointing', (ANY, EXTENDED, CURLED, CURLED, CURLED), False),
+    Gesture('open_palm', (EXTENDED, EXTENDED, EXTENDED, EXTENDED, EXTENDED), False),
+)
+
+
+def _vector_matrix():
+    # Rows: the 20 bones, finger by finger from the wrist out, then the thumb-index tip gap
+    matrix = np.zeros((21, NUM_LANDMARKS), dtype=np.float32)
+    for finger, chain in enumerate(FINGER_CHAINS):
+        for bone in range(4):
+            matrix[4 * finger + bone, chain[bone + 1]] = 1
+            matrix[4 * finger + bone, chain[bone]] = -1
+    matrix[20, INDEX_TIP] = 1
+    matrix[20, THUMB_TIP] = -1
+    return matrix
+
+
+VECTORS = _vector_matrix()
+PALM_BONE = 8  # Wrist to middle finger base
+TIP_GAP = 20
+# Joints as (bone, next bone), three per finger; the thumb's first joint at the wrist barely moves
+_JOINTS = [(4 * finger + bone, 4 * finger + bone + 1) for finger in range(5) for bone in range(3)]
+# Flat indices into the Gram matrix of VECTORS: bone dot products, then each side's squared length
+GRAM_INDEX = np.array([[a * 21 + b for a, b in _JOINTS], [a * 22 for a, _ in _JOINTS], [b * 22 for _, b in _JOINTS]])
+
+
+class GestureClassifier:
+    """Recognises ``gestures`` from a hand's ``(21, 3)`` landmarks.
+
+    The bones and the thumb-index gap come out of one matrix product with the
+    landmarks, and their dot products out of one more, giving all fifteen joint angles
+    at once. A finger whose joints bend less than ``extended_bend`` radians in total is
+    extended, one bent more than ``curled_bend`` is curled, and one in between is
+    neither; the hand pinches when the tips are closer than ``pinch_ratio`` palm
+    lengths. Finger states and pinch form a code, and a table built once per gesture
+    set maps every code to its first matching gesture, so the per-hand cost does not
+    grow with the number of gestures.
+    """
+
+    # Per finger, thumb first; the thumb has one joint fewer to bend and bends less
+    EXTENDED_BEND = (0.6, 1.0, 1.0, 1.0, 1.0)
+    CURLED_BEND = (1.0, 2.0, 2.0, 2.0, 2.0)
+
+    def __init__(self, gestures=DEFAULT_GESTURES, extended_bend=EXTENDED_BEND, curled_bend=CURLED_BEND,
+                 pinch_ratio=0.35):
+        self.gestures = tuple(gestures)
+        self.names = tuple(gesture.name for gesture in self.gestures)
+        self.pinch_ratio = pinch_ratio
+        # Sums each finger's joint angles, once against the extended and once against the curled limit
+        sums = np.zeros((15, 10), dtype=np.float32)
+        for joint in range(15):
+            if joint != 0:
+                sums[joint, joint // 3] = 1
+                sums[joint, 5 + joint // 3] = -1
+        self._sums = sums
+        self._limits = np.concatenate([extended_bend, -np.asarray(curled_bend)]).astype(np.float32)
+        self._bits = 1 << np.arange(10)
+        self.table = self._build_table()
+
+    def _build_table(self):
+        # Code: bits 0-4 set for extended fingers, bits 5-9 for curled ones, bit 10 for a pinch
+        codes = np.arange(1 << 11)
+        extended = (codes[:, None] >> np.arange(5)) & 1
+        curled = (codes[:, None] >> np.arange(5, 10)) & 1
+        state = np.where(extended == 1, EXTENDED, np.where(curled == 1, CURLED, 2))
+        pinch = (codes >> 10) & 1
+        fingers = np.array([gesture.fingers for gesture in self.gestures], dtype=np.int8).reshape(-1, 5)
+        wanted = np.array([-1 if gesture.pinch is None else int(gesture.pinch) for gesture in self.gestures])
+        found = ((fingers == ANY) | (fingers == state[:, None, :])).all(axis=2)
+        found &= (wanted == -1) | (wanted == pinch[:, None])
+        return np.where(found.any(axis=1), found.argmax(axis=1), -1).tolist() if self.gestures else [-1] * len(codes)
+
+    def index(self, name):
+        return self.names.index(name) if name in self.names else -1
+
+    def features(self, landmarks):
+        """``(angles, pinch)``: the 15 joint angles in radians, three per finger from the thumb's, and the tip gap in palm lengths."""
+        vectors = VECTORS @ landmarks
+        gram = vectors @ vectors.T
+        dots, first, second = gram.take(GRAM_INDEX)
+        # In place from here: small arrays, where each call's overhead is what costs
+        first *= second
+        first += 1e-12
+        np.sqrt(first, out=first)
+        dots /= first
+        np.minimum(dots, 1.0, out=dots)
+        np.maximum(dots, -1.0, out=dots)
+        angles = np.arccos(dots, out=dots)
+        pinch = (gram[TIP_GAP, TIP_GAP] / (gram[PALM_BONE, PALM_BONE] or 1.0)) ** 0.5
+        return angles, float(pinch)
+
+    def classify(self, landmarks):
+        """Index of the first matching gesture, or -1."""
+        angles, pinch = self.features(landmarks)
+        code = int(((angles @ self._sums) < self._limits) @ self._bits)
+        if pinch < self.pinch_ratio:
+            code |= 1 << 10
+        return self.table[code]
@@ -0,0 +1,120 @@
+"""Motion-gated hand tracking: a cheap frame difference stands in for the model while no hand is in view."""
+import time
+
+import cv2
+import numpy as np
+
+
+class IdleScheduler:
+    """Decides per frame whether hand tracking should run.
+
+    After ``idle_after`` inference results in a row without a hand, the scheduler goes
+    idle: each frame is reduced to a tiny grey thumbnail and compared with the previous
+    one, and hand tracking only runs every ``idle_interval`` seconds. A frame where more
+    than ``motion_fraction`` of the thumbnail changed by over ``motion_threshold`` grey
+    levels wakes it up, and that same frame is tracked.
+
+    Call ``should_infer`` before submitting a frame and ``update`` with every inference
+    result. ``skipped`` counts the frames that were not tracked while idle and
+    ``wake_latencies`` the seconds from a motion wake-up to the first hand found.
+    Process CPU time is accounted separately for idle and active stretches, so
+    ``cpu_saved`` measures the saving whatever the inference backend.
+    """
+
+    def __init__(self, idle_after=30, idle_interval=0.5, motion_threshold=12, motion_fraction=0.005,
+                 size=(64, 36)):
+        self.idle_after = idle_after
+        self.idle_interval = idle_interval
+        self.motion_threshold = motion_threshold
+        self.motion_fraction = motion_fraction
+        self.size = size
+        self.idle = False
+        self.skipped = 0
+        self.wakeups = 0
+        self.wake_latencies = []
+        self.motion_time = 0.0
+        self._misses = 0
+        self._next_probe = 0.0
+        self._woke_at = None
+        self._small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self._grey = np.empty((size[1], size[0]), dtype=np.uint8)
+        self._previous = np.empty_like(self._grey)
+        self._diff = np.empty_like(self._grey)
+        self._has_previous = False
+        # [active, idle] process CPU seconds and wall seconds
+        self.cpu = [0.0, 0.0]
+        self.wall = [0.0, 0.0]
+        self._last_cpu = None
+        self._last_now = 0.0
+
+    def _motion(self, image):
+        start = time.perf_counter()
+        # Nearest-neighbour sampling is enough for a motion check and much cheaper than area averaging
+        cv2.resize(image, self.size, dst=self._small, interpolation=cv2.INTER_NEAREST)
+        cv2.cvtColor(self._small, cv2.COLOR_RGB2GRAY, dst=self._grey)
+        moved = False
+        if self._has_previous:
+            cv2.absdiff(self._grey, self._previous, dst=self._diff)
+            changed = np.count_nonzero(self._diff > self.motion_threshold)
+            moved = changed > self.motion_fraction * self._diff.size
+        self._previous, self._grey = self._grey, self._previous
+        self._has_previous = True
+        self.motion_time += time.perf_counter() - start
+        return moved
+
+    def _account(self, now):
+        cpu = time.process_time()
+        if self._last_cpu is not None:
+            state = 1 if self.idle else 0
+            self.cpu[state] += cpu - self._last_cpu
+            self.wall[state] += now - self._last_now
+        self._last_cpu = cpu
+        self._last_now = now
+
+    def should_infer(self, image, now):
+        self._account(now)
+        if not self.idle:
+            return True
+        if self._motion(image):
+            self.idle = False
+            self._misses = 0
+            self.wakeups += 1
+            self._woke_at = now
+            return True
+        if now >= self._next_probe:
+            self._next_probe = now + self.idle_interval
+            return True
+        self.skipped += 1
+        return False
+
+    def update(self, hands, now):
+        if hands:
+            self._misses = 0
+            if self._woke_at is not None:
+                self.wake_latencies.append(now - self._woke_at)
+                self._woke_at = None
+            self.idle = False
+            return
+        self._misses += 1
+        if not self.idle and self._misses >= self.idle_after:
+            self.idle = True
+            self._has_previous = False
+            self._next_probe = now + self.idle_interval
+            self._woke_at = None
+
+    def cpu_load(self, state):
+        """Process CPU seconds per wall second while active (0) or idle (1)."""
+        return self.cpu[state] / self.wall[state] if self.wall[state] > 0 else 0.0
+
+    def cpu_saved(self):
+        """CPU seconds saved over the idle stretches, against running them at the active load."""
+        if not self.wall[0] or not self.wall[1]:
+            return 0.0
+        return (self.cpu_load(0) - self.cpu_load(1)) * self.wall[1]
+
+    def summary(self):
+        latency = f"{np.mean(self.wake_latencies) * 1000:.0f} ms" if self.wake_latencies else "n/a"
+        return (f"Idle {self.wall[1]:.0f} s of {self.wall[0] + self.wall[1]:.0f} s: CPU load "
+                f"{self.cpu_load(1) * 100:.0f}% idle vs {self.cpu_load(0) * 100:.0f}% active, "
+                f"~{self.cpu_saved():.1f} CPU s saved, {self.skipped} frames not tracked, "
+                f"{self.wakeups} wake-ups, wake-to-hand latency {latency}")
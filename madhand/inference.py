@@ -0,0 +1,149 @@
+"""Hand tracking backends behind one submit/poll interface."""
+import collections
+import threading
+import time
+
+from .landmarks import hands_from_results, hands_from_task_result
+
+
+class InferenceBackend:
+    """Common interface of the hand tracking backends.
+
+    ``submit(rgb, timestamp)`` hands over an RGB frame with its capture time and returns
+    False if the backend cannot take it now. ``poll(timeout=0.0)`` returns the
+    ``(timestamp, hands)`` results finished since the last call, in submission order,
+    waiting up to ``timeout`` seconds for the first one. Frames a backend skips simply
+    never produce a result. A backend that has failed and will produce no more results
+    raises ``RuntimeError`` from ``poll``.
+    """
+
+    submitted = 0
+    dropped = 0
+
+    def submit(self, rgb, timestamp):
+        raise NotImplementedError
+
+    def poll(self, timeout=0.0):
+        raise NotImplementedError
+
+    def in_flight(self):
+        return 0
+
+    def drain(self):
+        """Wait until a frame submitted now would be processed rather than skipped; returns the results collected."""
+        return []
+
+    def close(self):
+        pass
+
+
+class SolutionsBackend(InferenceBackend):
+    """The legacy ``mp.solutions.hands`` model, run to completion inside ``submit``.
+
+    ``detect`` maps an RGB frame to a list of ``Hand``; by default it is the plain
+    model, and a ``RoiTracker.process`` can be passed instead. The model stays owned
+    by the caller.
+    """
+
+    def __init__(self, hands_model, detect=None):
+        self.hands_model = hands_model
+        self.detect = detect or (lambda rgb: hands_from_results(hands_model.process(rgb)))
+        self.submitted = 0
+        self._ready = []
+
+    def submit(self, rgb, timestamp):
+        self._ready.append((timestamp, self.detect(rgb)))
+        self.submitted += 1
+        return True
+
+    def poll(self, timeout=0.0):
+        ready, self._ready = self._ready, []
+        return ready
+
+
+class TasksBackend(InferenceBackend):
+    """MediaPipe Tasks ``HandLandmarker`` in ``LIVE_STREAM`` mode.
+
+    ``submit`` only wraps the frame and returns; the landmarker runs on its own thread
+    and calls back with each result, skipping frames that arrive while it is busy.
+    ``model_path`` is a ``hand_landmarker.task`` model bundle.
+    """
+
+    def __init__(self, model_path, max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.7):
+        import mediapipe as mp
+        from mediapipe.tasks import python as mp_tasks
+        from mediapipe.tasks.python import vision
+
+        self._mp = mp
+        options = vision.HandLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=max_num_hands,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_result,
+        )
+        self.submitted = 0
+        self.dropped = 0
+        # Capture time per submitted millisecond timestamp, until its result (or a later one) arrives
+        self._pending = collections.OrderedDict()
+        self._results = collections.deque()
+        self._arrived = threading.Event()
+        self._last_ms = -1
+        self._landmarker = vision.HandLandmarker.create_from_options(options)
+
+    def _on_result(self, result, image, timestamp_ms):
+        # Runs on the landmarker's thread
+        timestamp = None
+        while self._pending:
+            ms, capture_time = self._pending.popitem(last=False)
+            if ms == timestamp_ms:
+                timestamp = capture_time
+                break
+            self.dropped += 1
+        if timestamp is None:
+            return
+        self._results.append((timestamp, hands_from_task_result(result)))
+        self._arrived.set()
+
+    def submit(self, rgb, timestamp):
+        # The landmarker needs strictly increasing integer milliseconds
+        ms = max(int(timestamp * 1000), self._last_ms + 1)
+        self._last_ms = ms
+        self._pending[ms] = timestamp
+        image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=rgb)
+        self._landmarker.detect_async(image, ms)
+        self.submitted += 1
+        return True
+
+    def poll(self, timeout=0.0):
+        if timeout > 0 and not self._results:
+            self._arrived.wait(timeout)
+        self._arrived.clear()
+        ready = []
+        while self._results:
+            ready.append(self._results.popleft())
+        return ready
+
+    def in_flight(self):
+        return len(self._pending)
+
+    def drain(self):
+        # The landmarker skips frames that arrive while it is busy
+        return wait_idle(self)
+
+    def close(self):
+        self._landmarker.close()
+        # Whatever never came back was skipped by the landmarker
+        self.dropped += len(self._pending)
+        self._pending.clear()
+
+
+def wait_idle(backend, timeout=5.0):
+    """Collect results until nothing is in flight or ``timeout`` passes; returns them."""
+    deadline = time.perf_counter() + timeout
+    results = []
+    while backend.in_flight() and time.perf_counter() < deadline:
+        results += backend.poll(timeout=0.1)
+    return results + backend.poll()
@@ -0,0 +1,67 @@
+"""Hand landmarks as plain NumPy arrays, independent of the MediaPipe result types."""
+import collections
+import itertools
+
+import cv2
+import numpy as np
+
+NUM_LANDMARKS = 21
+THUMB_TIP = 4
+INDEX_TIP = 8
+
+# Same topology as mediapipe.solutions.hands.HAND_CONNECTIONS
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+# landmarks: (21, 3) float32 array of normalized x, y, z
+Hand = collections.namedtuple('Hand', 'landmarks handedness score')
+
+
+def landmark_array(points):
+    """MediaPipe landmark points as a contiguous ``(21, 3)`` float32 array, filled in one pass."""
+    coordinates = itertools.chain.from_iterable((p.x, p.y, p.z) for p in points)
+    return np.fromiter(coordinates, dtype=np.float32, count=NUM_LANDMARKS * 3).reshape(NUM_LANDMARKS, 3)
+
+
+def hands_from_results(results):
+    """Convert a ``mp.solutions.hands`` result into a list of ``Hand``."""
+    if not results.multi_hand_landmarks:
+        return []
+
+    hands = []
+    for i, hand_landmarks in enumerate(results.multi_hand_landmarks):
+        landmarks = landmark_array(hand_landmarks.landmark)
+        handedness, score = 'Unknown', 1.0
+        if results.multi_handedness and i < len(results.multi_handedness):
+            classification = results.multi_handedness[i].classification[0]
+            handedness, score = classification.label, classification.score
+        hands.append(Hand(landmarks, handedness, score))
+    return hands
+
+
+def hands_from_task_result(result):
+    """Convert a MediaPipe Tasks ``HandLandmarkerResult`` into a list of ``Hand``."""
+    hands = []
+    for i, hand_landmarks in enumerate(result.hand_landmarks):
+        landmarks = landmark_array(hand_landmarks)
+        handedness, score = 'Unknown', 1.0
+        if i < len(result.handedness) and result.handedness[i]:
+            category = result.handedness[i][0]
+            handedness, score = category.category_name, category.score
+        hands.append(Hand(landmarks, handedness, score))
+    return hands
+
+
+def draw_hand(image, landmarks):
+    # Styled like mp.solutions.drawing_utils.draw_landmarks defaults
+    h, w = image.shape[:2]
+    points = [(int(x * w), int(y * h)) for x, y in landmarks[:, :2].tolist()]
+    for start, end in HAND_CONNECTIONS:
+        cv2.line(image, points[start], points[end], (224, 224, 224), 2)
+    for point in points:
+        cv2.circle(image, point, 2, (0, 0, 255), 2)
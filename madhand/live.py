@@ -0,0 +1,26 @@
+"""Hand-off of settings that may change while the pipeline is running."""
+import threading
+
+
+class LiveValue:
+    """Holds the latest snapshot of a value set from one thread and read from another.
+
+    The snapshot (usually a frozen dataclass) is swapped as a whole, so a reader sees
+    either the old value or the new one, never a mix. Readers call ``snapshot`` once per
+    frame and only react when the version has moved on.
+    """
+
+    def __init__(self, value):
+        self._lock = threading.Lock()
+        self._current = (0, value)
+
+    def set(self, value):
+        with self._lock:
+            self._current = (self._current[0] + 1, value)
+
+    def get(self):
+        return self._current[1]
+
+    def snapshot(self):
+        """Returns ``(version, value)``."""
+        return self._current
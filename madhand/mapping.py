@@ -0,0 +1,97 @@
+"""Hand height to note and velocity, through lookup tables built once per configuration."""
+from collections import namedtuple
+
+import numpy as np
+
+NOTE_NAMES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+
+# Semitones above the root
+SCALES = {
+    'chromatic': tuple(range(12)),
+    'major': (0, 2, 4, 5, 7, 9, 11),
+    'minor': (0, 2, 3, 5, 7, 8, 10),
+    'harmonic_minor': (0, 2, 3, 5, 7, 8, 11),
+    'dorian': (0, 2, 3, 5, 7, 9, 10),
+    'pentatonic': (0, 2, 4, 7, 9),
+    'minor_pentatonic': (0, 3, 5, 7, 10),
+    'blues': (0, 3, 5, 6, 7, 10),
+}
+
+# ``top`` and ``bottom`` are image heights (0 at the top, 1 at the bottom); ``hysteresis``
+# is how far past its edges, as a fraction of its height, a hand has to go to leave the zone
+Zone = namedtuple('Zone', 'top bottom note hysteresis')
+
+RESOLUTION = 4096
+
+
+def scale_notes(min_note, max_note, scale='chromatic', root=0):
+    """Notes of ``scale`` on ``root`` (0 = C) between ``min_note`` and ``max_note``, inclusive."""
+    steps = set(SCALES[scale])
+    notes = [note for note in range(min_note, max_note + 1) if (note - root) % 12 in steps]
+    if not notes:
+        raise ValueError(f"No notes of {NOTE_NAMES[root % 12]} {scale} between {min_note} and {max_note}")
+    return notes
+
+
+def scale_zones(notes, hysteresis=0.0):
+    """Equal-height zones for ``notes``, the highest note at the top of the image."""
+    height = 1.0 / len(notes)
+    return [Zone(i * height, (i + 1) * height, note, hysteresis)
+            for i, note in enumerate(sorted(notes, reverse=True))]
+
+
+class NoteMap:
+    """Precompiled y -> zone and y -> velocity tables.
+
+    ``zones`` are ``Zone`` tuples; heights outside every zone fall to the nearest one.
+    Lookups index a table of ``resolution`` entries, so their cost does not depend on
+    how many zones there are. A hand stays in its current zone until it moves past the
+    zone's edge by that zone's hysteresis, which keeps notes from flickering on a boundary.
+    """
+
+    def __init__(self, zones, velocity_range=(127, 30), resolution=RESOLUTION):
+        if not zones:
+            raise ValueError("NoteMap needs at least one zone")
+        self.zones = sorted(zones, key=lambda zone: zone.top)
+        self.resolution = resolution
+        self._scale = resolution - 1
+        centres = (np.arange(resolution) + 0.5) / resolution
+
+        tops = np.array([zone.top for zone in self.zones])
+        bottoms = np.array([zone.bottom for zone in self.zones])
+        # Zone whose span holds each entry, else the one with the nearest edge
+        distance = np.maximum(tops[None, :] - centres[:, None], centres[:, None] - bottoms[None, :])
+        self.zone_table = np.argmin(distance, axis=1).astype(np.int16).tolist()
+        self.notes = [zone.note for zone in self.zones]
+        margins = [zone.hysteresis * (zone.bottom - zone.top) for zone in self.zones]
+        self.enter_top = [zone.top - margin for zone, margin in zip(self.zones, margins)]
+        self.enter_bottom = [zone.bottom + margin for zone, margin in zip(self.zones, margins)]
+
+        high, low = velocity_range
+        self.velocity_table = np.round(high + (low - high) * centres).astype(np.int16).tolist()
+
+    @classmethod
+    def from_config(cls, config):
+        if config.zones:
+            zones = [Zone(*zone) if len(zone) == 4 else Zone(*zone, config.hysteresis) for zone in config.zones]
+        else:
+            zones = scale_zones(scale_notes(config.min_note, config.max_note, config.scale, config.root),
+                                config.hysteresis)
+        return cls(zones)
+
+    def index(self, y):
+        i = int(y * self._scale)
+        if i < 0:
+            return 0
+        if i > self._scale:
+            return self._scale
+        return i
+
+    def zone(self, y, current=-1):
+        """Zone for height ``y``, staying in ``current`` while ``y`` is inside its hysteresis band."""
+        if current >= 0 and self.enter_top[current] <= y <= self.enter_bottom[current]:
+            return current
+        return self.zone_table[self.index(y)]
+
+    def velocity(self, y):
+        return self.velocity_table[self.index(y)]
@@ -0,0 +1,188 @@
+"""Per-stage timing histograms for the live pipeline, with text exports for monitoring."""
+import bisect
+import math
+import os
+import time
+
+# Bucket upper bounds in seconds: 4 per octave from 10 us to ~10 s, then overflow
+BUCKET_BOUNDS = tuple(1e-5 * 2 ** (i / 4) for i in range(81)) + (math.inf,)
+
+
+class Histogram:
+    """Fixed log-spaced buckets; recording a value only increments a preallocated counter."""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKET_BOUNDS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+
+def percentile(counts, fraction):
+    """Upper bound of the bucket holding the ``fraction`` quantile of ``counts``, or 0.0 if empty."""
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = fraction * total
+    seen = 0
+    for bound, count in zip(BUCKET_BOUNDS, counts):
+        seen += count
+        if seen >= rank:
+            return bound if bound != math.inf else BUCKET_BOUNDS[-2]
+    return BUCKET_BOUNDS[-2]
+
+
+class Metrics:
+    """Latency histograms per pipeline stage, plus frame and drop counts.
+
+    Time a stage with ``start = metrics.clock()`` ... ``metrics.record('stage', start)``.
+    Each stage should be recorded from a single thread. ``roll`` closes the current
+    window and returns its FPS and p50/p99 per stage without resetting the cumulative
+    histograms, which are what the exporters write. Use ``NullMetrics`` to switch
+    instrumentation off.
+    """
+
+    enabled = True
+    clock = staticmethod(time.perf_counter)
+
+    def __init__(self):
+        self.stages = {}
+        self.frames = 0
+        self.dropped = 0
+        self._window_start = time.perf_counter()
+        self._window_frames = 0
+        self._window_counts = {}
+        self.window = {}
+
+    def record(self, stage, start):
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = Histogram()
+        histogram.record(time.perf_counter() - start)
+
+    def frame(self, dropped=None):
+        self.frames += 1
+        if dropped is not None:
+            self.dropped = dropped
+
+    def roll(self):
+        """Close the current window; returns and keeps in ``window`` a dict of its statistics."""
+        now = time.perf_counter()
+        elapsed = now - self._window_start
+        window = {'fps': (self.frames - self._window_frames) / elapsed if elapsed > 0 else 0.0,
+                  'dropped': self.dropped, 'stages': {}}
+        for stage, histogram in list(self.stages.items()):
+            counts = list(histogram.counts)
+            previous = self._window_counts.get(stage)
+            delta = counts if previous is None else [a - b for a, b in zip(counts, previous)]
+            self._window_counts[stage] = counts
+            # Bucket bounds can overshoot the largest value actually seen
+            window['stages'][stage] = (min(percentile(delta, 0.5), histogram.max),
+                                       min(percentile(delta, 0.99), histogram.max))
+        self._window_start = now
+        self._window_frames = self.frames
+        self.window = window
+        return window
+
+    def overlay_lines(self):
+        """Text for the preview overlay, from the last ``roll``."""
+        window = self.window
+        if not window:
+            return []
+        lines = [f"{window['fps']:.1f} fps  dropped {window['dropped']}"]
+        for stage, (p50, p99) in window['stages'].items():
+            lines.append(f"{stage:<10} p50 {p50 * 1000:6.2f}  p99 {p99 * 1000:6.2f} ms")
+        return lines
+
+
+class NullMetrics:
+    """Stands in for ``Metrics`` when instrumentation is off; every call is a no-op."""
+
+    enabled = False
+    window = {}
+
+    @staticmethod
+    def clock():
+        return 0.0
+
+    def record(self, stage, start):
+        pass
+
+    def frame(self, dropped=None):
+        pass
+
+    def roll(self):
+        return {}
+
+    def overlay_lines(self):
+        return []
+
+
+def prometheus_text(metrics):
+    lines = ['# TYPE madhand_frames_total counter', f'madhand_frames_total {metrics.frames}',
+             '# TYPE madhand_dropped_frames_total counter', f'madhand_dropped_frames_total {metrics.dropped}',
+             '# TYPE madhand_stage_seconds histogram']
+    for stage, histogram in list(metrics.stages.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKET_BOUNDS, histogram.counts):
+            cumulative += count
+            # Only the buckets that carry information, to keep the file small
+            if count or bound == math.inf:
+                le = '+Inf' if bound == math.inf else f'{bound:.6g}'
+                lines.append(f'madhand_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+        lines.append(f'madhand_stage_seconds_sum{{stage="{stage}"}} {histogram.total:.6f}')
+        lines.append(f'madhand_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsExporter:
+    """Writes ``metrics`` to ``path`` every ``interval`` seconds when ``maybe_export`` is called.
+
+    A ``.csv`` path gets one row per stage per export (time, stage, count, p50, p99, max,
+    plus frames and drops); any other path is rewritten in the Prometheus text format,
+    atomically, for a node_exporter textfile collector.
+    """
+
+    CSV_HEADER = 'time,stage,count,p50_ms,p99_ms,max_ms,frames,dropped\n'
+
+    def __init__(self, metrics, path, interval=10.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.csv = path.lower().endswith('.csv')
+        self._next_time = time.monotonic() + interval
+        if self.csv and not os.path.exists(path):
+            with open(path, 'w') as f:
+                f.write(self.CSV_HEADER)
+
+    def maybe_export(self):
+        now = time.monotonic()
+        if now < self._next_time:
+            return False
+        self._next_time = now + self.interval
+        self.export()
+        return True
+
+    def export(self):
+        metrics = self.metrics
+        if self.csv:
+            stamp = time.strftime('%Y-%m-%dT%H:%M:%S')
+            with open(self.path, 'a') as f:
+                for stage, histogram in list(metrics.stages.items()):
+                    counts = list(histogram.counts)
+                    p50 = min(percentile(counts, 0.5), histogram.max)
+                    p99 = min(percentile(counts, 0.99), histogram.max)
+                    f.write(f"{stamp},{stage},{histogram.count},{p50 * 1000:.3f},{p99 * 1000:.3f},{histogram.max * 1000:.3f},"
+                            f"{metrics.frames},{metrics.dropped}\n")
+        else:
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as f:
+                f.write(prometheus_text(metrics))
+            os.replace(tmp, self.path)
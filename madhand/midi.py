@@ -0,0 +1,265 @@
+"""MIDI output on its own thread, fed through a lock-free event queue."""
+import collections
+import threading
+import time
+
+import mido
+
+from .channels import mask_channels
+from .metrics import NullMetrics
+
+NOTE_OFF = 0x80
+NOTE_ON = 0x90
+CONTROL_CHANGE = 0xB0
+PITCH_BEND = 0xE0
+
+
+class NullSink:
+    """Stand-in port that discards everything, for headless runs."""
+
+    def send(self, message):
+        pass
+
+    def close(self):
+        pass
+
+
+class InMemorySink:
+    """Stand-in port that keeps every message with the time it was sent."""
+
+    def __init__(self):
+        self.messages = []
+
+    def send(self, message):
+        self.messages.append((time.perf_counter(), message))
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    """Stand-in port that writes one ``<seconds> <message>`` line per message."""
+
+    def __init__(self, path):
+        self.file = open(path, 'w')
+        self.start = time.perf_counter()
+
+    def send(self, message):
+        self.file.write(f"{time.perf_counter() - self.start:.6f} {message}\n")
+
+    def close(self):
+        self.file.close()
+
+
+class MidiDispatcher:
+    """Sends note events to a mido-compatible port from a background thread.
+
+    Callers only append to a deque, which is atomic in CPython, so the vision loop never
+    waits on the port. Each wake-up drains every pending event, reduces them to the net
+    change per note and fans that out over the channels in ``mask``. A note held
+    by several voices on the same channels sounds until the last of them releases it. With
+    ``metrics``, the time spent sending each batch is recorded as the ``midi_send`` stage.
+
+    Controller values (CC 0-127, pitch bend -8192..8191) are sent at most ``control_rate``
+    times a second per controller and channel mask, only the latest value is kept while
+    waiting, and a value within ``deadband`` of the last one sent (in CC steps; pitch bend
+    steps are 128 times finer) is dropped. Controller traffic is therefore bounded no
+    matter how often values are set.
+
+    ``recorder``, if set (also while running), is given every message right after it is
+    sent, e.g. a ``MidiRecorder`` writing the session to a file.
+    """
+
+    def __init__(self, port, mask=0x0001, metrics=None, control_rate=100.0, deadband=1):
+        self.port = port
+        self.mask = mask
+        self.metrics = metrics or NullMetrics()
+        self.control_interval = 1.0 / control_rate
+        self.deadband = deadband
+        self._events = collections.deque()
+        self._wake = threading.Event()
+        self._thread = None
+        self._running = False
+        self._messages = {}
+        self._active = {}
+        self._channels = {}
+        # Per (status, controller, mask): value waiting to be sent, last value sent, earliest next send
+        self._pending_controls = {}
+        self._controls = {}
+        self._next_control = {}
+        self.recorder = None
+        self.sent = 0
+        self.coalesced = 0
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='MidiDispatcher', daemon=True)
+        self._thread.start()
+        return self
+
+    def note_on(self, note, velocity, mask=None):
+        self._events.append((NOTE_ON, note, velocity, mask or self.mask))
+        self._wake.set()
+
+    def note_off(self, note, mask=None):
+        self._events.append((NOTE_OFF, note, 0, mask or self.mask))
+        self._wake.set()
+
+    def control_change(self, controller, value, mask=None):
+        self._events.append((CONTROL_CHANGE, controller, value, mask or self.mask))
+        self._wake.set()
+
+    def pitch_bend(self, value, mask=None):
+        self._events.append((PITCH_BEND, 0, value, mask or self.mask))
+        self._wake.set()
+
+    def stop(self):
+        """Flush pending events, release any sounding notes and stop the thread."""
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for note, mask in list(self._active):
+            self._send(NOTE_OFF, note, 0, mask)
+        self._active.clear()
+        # Last controller values go out regardless of the rate, then pitch bend returns to centre
+        for key, value in self._pending_controls.items():
+            self._send_control(key, value)
+        self._pending_controls.clear()
+        for key, value in list(self._controls.items()):
+            if key[0] == PITCH_BEND and value != 0:
+                self._send_control(key, 0)
+
+    def _message(self, status, data1, data2):
+        key = (status, data1, data2)
+        message = self._messages.get(key)
+        if message is None:
+            message = self._messages[key] = mido.Message.from_bytes([status, data1, data2])
+        return message
+
+    def _send(self, status, note, velocity, mask):
+        channels = self._channels.get(mask)
+        if channels is None:
+            channels = self._channels[mask] = mask_channels(mask)
+        recorder = self.recorder
+        for channel in channels:
+            message = self._message(status | channel, note, velocity)
+            self.port.send(message)
+            if recorder is not None:
+                recorder.record(message)
+            self.sent += 1
+
+    def _send_control(self, key, value):
+        status, controller, mask = key
+        channels = self._channels.get(mask)
+        if channels is None:
+            channels = self._channels[mask] = mask_channels(mask)
+        recorder = self.recorder
+        for channel in channels:
+            if status == PITCH_BEND:
+                bend = value + 8192
+                message = mido.Message.from_bytes([PITCH_BEND | channel, bend & 0x7F, bend >> 7])
+            else:
+                message = self._message(CONTROL_CHANGE | channel, controller, value)
+            self.port.send(message)
+            if recorder is not None:
+                recorder.record(message)
+            self.sent += 1
+        self._controls[key] = value
+
+    def _flush_controls(self, now):
+        """Send the pending controller values that are due; returns seconds until the next one is."""
+        wait = None
+        for key in list(self._pending_controls):
+            due = self._next_control.get(key, 0.0)
+            if now < due:
+                wait = due - now if wait is None else min(wait, due - now)
+                continue
+            self._send_control(key, self._pending_controls.pop(key))
+            self._next_control[key] = now + self.control_interval
+        return wait
+
+    def flush(self):
+        """Send the queued events and the controller values now due, on the calling thread.
+
+        The dispatcher thread calls this on every wake-up; call it directly only on a
+        dispatcher that was not started, e.g. to time dispatching in a benchmark. Returns
+        the seconds until the next waiting controller value is due, or None.
+        """
+        batch = []
+        while self._events:
+            batch.append(self._events.popleft())
+        if not batch and not self._pending_controls:
+            return None
+        start = self.metrics.clock()
+        if batch:
+            self._dispatch(batch)
+        due = self._flush_controls(time.perf_counter())
+        self.metrics.record('midi_send', start)
+        return due
+
+    def _run(self):
+        wait = 0.1
+        while True:
+            self._wake.wait(wait)
+            self._wake.clear()
+            due = self.flush()
+            wait = 0.1 if due is None else due
+            # Controller values still waiting on the rate limit are sent by ``stop``
+            if not self._running and not self._events:
+                break
+
+    def _queue_controls(self, controls):
+        for key, value in controls:
+            last = self._controls.get(key)
+            band = self.deadband * 128 if key[0] == PITCH_BEND else self.deadband
+            if last is not None and abs(value - last) < band:
+                self._pending_controls.pop(key, None)
+                self.coalesced += 1
+                continue
+            if key in self._pending_controls:
+                self.coalesced += 1
+            self._pending_controls[key] = value
+
+    def _dispatch(self, batch):
+        # Replay the batch against the current note state, counting the voices holding each note, and only send what changed
+        final = {}
+        controls = []
+        for status, note, velocity, mask in batch:
+            if status == CONTROL_CHANGE or status == PITCH_BEND:
+                controls.append(((status, note, mask), velocity))
+                continue
+            key = (note, mask)
+            state = final.get(key)
+            if state is None:
+                state = final[key] = [*self._active.get(key, (None, 0)), False]
+            if status == NOTE_ON:
+                if not state[1]:
+                    state[0] = velocity
+                state[1] += 1
+            elif state[1]:
+                state[1] -= 1
+                # Released by every voice, so a note_on later in the batch has to retrigger it
+                state[2] = state[2] or not state[1]
+        if controls:
+            self._queue_controls(controls)
+            batch = [event for event in batch if event[0] == NOTE_ON or event[0] == NOTE_OFF]
+
+        sent_here = 0
+        ons = []
+        for key, (velocity, holders, released) in final.items():
+            sounding = key in self._active
+            if sounding and (released or not holders):
+                self._send(NOTE_OFF, key[0], 0, key[1])
+                sent_here += 1
+            if holders:
+                self._active[key] = (velocity, holders)
+                if released or not sounding:
+                    ons.append((key, velocity))
+            else:
+                self._active.pop(key, None)
+        for key, velocity in ons:
+            self._send(NOTE_ON, key[0], velocity, key[1])
+            sent_here += 1
+        self.coalesced += len(batch) - sent_here
@@ -0,0 +1,113 @@
+"""Session recording of the MIDI output to a Standard MIDI File, written on a background thread.
+
+The file is a format 0 SMF with a single track. Events are appended as they arrive and
+the end-of-track marker and track length are rewritten after every flush, so the file
+on disk is always complete and playable up to the last flush.
+"""
+import collections
+import struct
+import threading
+import time
+
+import mido
+
+TICKS_PER_BEAT = 480
+TEMPO = 500000  # Microseconds per beat, 120 bpm
+END_OF_TRACK = b'\x00\xff\x2f\x00'
+
+
+def variable_length(value):
+    """``value`` as a MIDI variable-length quantity."""
+    data = bytearray([value & 0x7F])
+    value >>= 7
+    while value:
+        data.insert(0, 0x80 | (value & 0x7F))
+        value >>= 7
+    return bytes(data)
+
+
+class MidiRecorder:
+    """Records the messages a ``MidiDispatcher`` sends to ``path`` as a ``.mid`` file.
+
+    ``record`` is called on the dispatcher's thread right after each send: it only
+    timestamps the message and appends it to a deque of at most ``capacity`` entries,
+    counting messages that find it full as ``dropped``. A writer thread drains the deque
+    every ``flush_interval`` seconds, so a crash loses at most that much of the session.
+    """
+
+    def __init__(self, path, capacity=8192, flush_interval=2.0, name="MadHand session"):
+        self.path = path
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.recorded = 0
+        self.dropped = 0
+        self._queue = collections.deque()
+        self._wake = threading.Event()
+        self._thread = None
+        self._running = False
+        self._start = None
+        self._last_tick = 0
+        self._ticks_per_second = TICKS_PER_BEAT * 1e6 / TEMPO
+        self._file = open(path, 'wb')
+        self._file.write(b'MThd' + struct.pack('>IHHH', 6, 0, 1, TICKS_PER_BEAT))
+        self._length_at = self._file.tell() + 4
+        self._file.write(b'MTrk' + struct.pack('>I', 0))
+        self._track_start = self._file.tell()
+        for meta in (mido.MetaMessage('track_name', name=name), mido.MetaMessage('set_tempo', tempo=TEMPO)):
+            self._file.write(b'\x00' + bytes(meta.bytes()))
+        self._end = self._file.tell()
+        self._finish_track()
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='MidiRecorder', daemon=True)
+        self._thread.start()
+        return self
+
+    def record(self, message):
+        if len(self._queue) >= self.capacity:
+            self.dropped += 1
+            return
+        self._queue.append((time.perf_counter(), message))
+
+    def stop(self):
+        """Write what is still queued and close the file."""
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._file.close()
+
+    def duration(self):
+        return self._last_tick / self._ticks_per_second
+
+    def _run(self):
+        while self._running:
+            self._wake.wait(self.flush_interval)
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        """Append the queued messages to the track and leave a complete file on disk."""
+        if not self._queue:
+            return
+        chunk = bytearray()
+        while self._queue:
+            timestamp, message = self._queue.popleft()
+            tick = max(int(round((timestamp - self._start) * self._ticks_per_second)), self._last_tick)
+            chunk += variable_length(tick - self._last_tick)
+            chunk += bytes(message.bytes())
+            self._last_tick = tick
+            self.recorded += 1
+        self._file.seek(self._end)
+        self._file.write(chunk)
+        self._end = self._file.tell()
+        self._finish_track()
+
+    def _finish_track(self):
+        self._file.write(END_OF_TRACK)
+        self._file.seek(self._length_at)
+        self._file.write(struct.pack('>I', self._end + len(END_OF_TRACK) - self._track_start))
+        self._file.flush()
@@ -0,0 +1,167 @@
+"""Hand tracking spread over worker processes, with frames handed over in shared memory."""
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .inference import InferenceBackend
+from .landmarks import hands_from_results
+
+
+def _worker(shm_name, shape, slot_count, max_num_hands, tasks, results):
+    import mediapipe as mp
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frames = np.ndarray((slot_count,) + shape, dtype=np.uint8, buffer=shm.buf)
+    hands = mp.solutions.hands.Hands(max_num_hands=max_num_hands,
+                                     min_detection_confidence=0.7, min_tracking_confidence=0.7)
+    try:
+        # The first inference is the slowest; pay for it before reporting ready
+        hands.process(np.zeros(shape, dtype=np.uint8))
+        results.put(None)
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            seq, slot, timestamp = task
+            results.put((seq, slot, timestamp, hands_from_results(hands.process(frames[slot]))))
+    finally:
+        hands.close()
+        del frames
+        shm.close()
+
+
+class ParallelInference(InferenceBackend):
+    """Runs ``workers`` MediaPipe Hands models in separate processes.
+
+    ``submit`` copies an RGB frame into a free slot of a shared-memory ring and queues
+    only its sequence number; ``poll`` returns finished results strictly in submission
+    order (the ``InferenceBackend`` interface). At most ``max_in_flight`` frames are queued or being processed, which bounds
+    latency: when the window is full ``submit`` refuses the frame.
+
+    Worker processes are spawned, so callers must keep their entry point behind an
+    ``if __name__ == '__main__'`` guard. Each reports in once its model is loaded
+    (``ready`` counts them, ``wait_ready`` waits for all); ``poll`` raises
+    ``RuntimeError`` if a worker has died, since its frames would never come back.
+    """
+
+    def __init__(self, workers=2, max_in_flight=None, max_num_hands=2):
+        self.workers = workers
+        self.max_in_flight = max_in_flight or workers * 2
+        self.max_num_hands = max_num_hands
+        self.submitted = 0
+        self.refused = 0
+        self.ready = 0
+        self._context = multiprocessing.get_context('spawn')
+        self._processes = []
+        self._shape = None
+        self._shm = None
+        self._frames = None
+        self._free = []
+        self._pending = {}
+        self._next_seq = 0
+        self._tasks = None
+        self._results = None
+
+    def _start(self, shape):
+        self._shape = shape
+        slot_count = self.max_in_flight
+        self._shm = shared_memory.SharedMemory(create=True, size=slot_count * int(np.prod(shape)))
+        self._frames = np.ndarray((slot_count,) + shape, dtype=np.uint8, buffer=self._shm.buf)
+        self._free = list(range(slot_count))
+        self._tasks = self._context.Queue()
+        self._results = self._context.Queue()
+        for _ in range(self.workers):
+            process = self._context.Process(
+                target=_worker, daemon=True,
+                args=(self._shm.name, shape, slot_count, self.max_num_hands, self._tasks, self._results))
+            process.start()
+            self._processes.append(process)
+
+    def in_flight(self):
+        return self.max_in_flight - len(self._free) if self._shm is not None else 0
+
+    def submit(self, rgb, timestamp):
+        """Queue a frame for inference; returns False if the in-flight window is full."""
+        if self._shm is None:
+            self._start(rgb.shape)
+        elif rgb.shape != self._shape:
+            raise ValueError(f"frame shape changed from {self._shape} to {rgb.shape}")
+        if not self._free:
+            self.refused += 1
+            return False
+
+        slot = self._free.pop()
+        np.copyto(self._frames[slot], rgb)
+        self._tasks.put((self.submitted, slot, timestamp))
+        self.submitted += 1
+        return True
+
+    def poll(self, timeout=0.0):
+        """Return ``(timestamp, hands)`` for every result that is next in sequence.
+
+        With a ``timeout`` it waits up to that long for the first result to arrive.
+        """
+        if self._results is None:
+            return []
+        if not self._collect(timeout) and self.in_flight():
+            self._check_workers()
+
+        ready = []
+        while self._next_seq in self._pending:
+            ready.append(self._pending.pop(self._next_seq))
+            self._next_seq += 1
+        return ready
+
+    def wait_ready(self, shape, timeout=60.0):
+        """Start the workers for frames of ``shape`` if needed and wait until every model is loaded."""
+        if self._shm is None:
+            self._start(shape)
+        deadline = time.perf_counter() + timeout
+        while self.ready < self.workers:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise RuntimeError(f"{self.workers - self.ready} of {self.workers} hand tracking workers not ready "
+                                   f"after {timeout:g} s")
+            self._collect(min(remaining, 0.5))
+            self._check_workers()
+
+    def _collect(self, timeout):
+        """Move arrived results into ``_pending``, waiting up to ``timeout`` for the first; returns how many."""
+        count = 0
+        deadline = time.perf_counter() + timeout
+        while True:
+            try:
+                remaining = deadline - time.perf_counter()
+                item = self._results.get(timeout=remaining) if remaining > 0 else self._results.get_nowait()
+            except queue.Empty:
+                return count
+            if item is None:
+                self.ready += 1
+                continue
+            seq, slot, timestamp, hands = item
+            self._free.append(slot)
+            self._pending[seq] = (timestamp, hands)
+            count += 1
+            deadline = 0.0
+
+    def _check_workers(self):
+        for process in self._processes:
+            if not process.is_alive():
+                raise RuntimeError(f"hand tracking worker {process.pid} exited with code {process.exitcode}")
+
+    def close(self):
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        if self._shm is not None:
+            self._frames = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
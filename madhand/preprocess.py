@@ -0,0 +1,51 @@
+"""Per-frame colour preprocessing into reused buffers."""
+import cv2
+import numpy as np
+
+
+def build_tint_lut(red=0.5, green=1.2, blue=0.5):
+    # One 256-entry table per BGR channel, truncated the same way the float path was
+    levels = np.arange(256, dtype=np.float32)
+    lut = np.empty((1, 256, 3), dtype=np.uint8)
+    for channel, gain in enumerate((blue, green, red)):
+        lut[0, :, channel] = np.clip(levels * gain, 0, 255).astype(np.uint8)
+    return lut
+
+
+class FramePreprocessor:
+    """Flips a BGR camera frame, converts it to RGB for inference and builds the tinted preview.
+
+    All outputs are written into buffers that are allocated once per frame size, so the
+    returned arrays are only valid until the next call to ``process``.
+    """
+
+    def __init__(self, tint=True):
+        self.tint = tint
+        self.lut = build_tint_lut()
+        self._shape = None
+        self._flipped = None
+        self._rgb = None
+        self._preview = None
+
+    def _allocate(self, shape):
+        self._shape = shape
+        self._flipped = np.empty(shape, dtype=np.uint8)
+        self._rgb = np.empty(shape, dtype=np.uint8)
+        self._preview = np.empty(shape, dtype=np.uint8)
+
+    def process(self, image, preview=True):
+        """Return ``(rgb, preview_bgr)``; ``preview_bgr`` is None when the preview is off."""
+        if image.shape != self._shape:
+            self._allocate(image.shape)
+
+        cv2.flip(image, 1, dst=self._flipped)
+        cv2.cvtColor(self._flipped, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        if not preview:
+            return self._rgb, None
+
+        if not self.tint:
+            return self._rgb, self._flipped
+
+        # Tinting the flipped BGR frame directly skips the RGB->BGR round trip
+        cv2.LUT(self._flipped, self.lut, dst=self._preview)
+        return self._rgb, self._preview
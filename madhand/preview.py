@@ -0,0 +1,73 @@
+"""Preview frames rendered at their own rate into a small pool of reused buffers."""
+import collections
+import threading
+
+import cv2
+import numpy as np
+
+from .landmarks import draw_hand
+
+
+class PreviewRenderer:
+    """Downscales, tints and annotates preview frames, at most ``fps`` times a second.
+
+    ``render`` returns ``(index, buffer)``; the caller may hand ``buffer`` to another
+    thread without copying it and must call ``release(index)`` once that thread is
+    done with it. Buffers are not reused before they are released, and when none is
+    free the frame is simply not previewed, so a slow or hidden UI never stalls the
+    caller. Nothing is drawn or converted while ``visible`` is False or ``fps`` is 0.
+    Lines of ``overlay`` text, such as ``Metrics.overlay_lines()``, are drawn top left.
+    """
+
+    def __init__(self, width=640, height=360, fps=30, tint_lut=None, buffers=3):
+        self.width = width
+        self.height = height
+        self.tint_lut = tint_lut
+        self.visible = True
+        self.rendered = 0
+        self.skipped = 0
+        self._interval = 0.0
+        self._next_time = 0.0
+        self._buffers = [None] * buffers
+        self._free = collections.deque(range(buffers))
+        self._lock = threading.Lock()
+        self.set_fps(fps)
+
+    def set_fps(self, fps):
+        self.fps = fps
+        self._interval = 1.0 / fps if fps > 0 else 0.0
+
+    def _buffer(self, index, image):
+        h, w = image.shape[:2]
+        scale = min(self.width / w, self.height / h)
+        shape = (max(1, round(h * scale)), max(1, round(w * scale)), 3)
+        buffer = self._buffers[index]
+        if buffer is None or buffer.shape != shape:
+            buffer = self._buffers[index] = np.empty(shape, dtype=np.uint8)
+        return buffer
+
+    def render(self, image, hands, now, overlay=()):
+        """Render ``image`` with ``hands`` drawn on it if a preview frame is due, else return None."""
+        if not self.visible or self.fps <= 0 or now < self._next_time:
+            return None
+        with self._lock:
+            if not self._free:
+                self.skipped += 1
+                return None
+            index = self._free.popleft()
+        self._next_time = max(self._next_time, now) + self._interval
+
+        buffer = self._buffer(index, image)
+        cv2.resize(image, (buffer.shape[1], buffer.shape[0]), dst=buffer, interpolation=cv2.INTER_LINEAR)
+        if self.tint_lut is not None:
+            cv2.LUT(buffer, self.tint_lut, dst=buffer)
+        for hand in hands:
+            draw_hand(buffer, hand.landmarks)
+        for i, line in enumerate(overlay):
+            cv2.putText(buffer, line, (8, 16 + 15 * i), cv2.FONT_HERSHEY_PLAIN, 1.0, (255, 255, 255), 1, cv2.LINE_AA)
+        self.rendered += 1
+        return index, buffer
+
+    def release(self, index):
+        with self._lock:
+            self._free.append(index)
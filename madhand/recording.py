@@ -0,0 +1,95 @@
+"""Compact landmark recordings that replay through the engine without hand tracking.
+
+A recording is an 8-byte header followed by fixed-size records, one per frame::
+
+    time        float64              seconds since the start of the take
+    count       uint8                hands detected in this frame
+    handedness  uint8[max_hands]     0 unknown, 1 left, 2 right
+    score       float32[max_hands]
+    landmarks   float32[max_hands, 21, 3]
+
+Records are read back through ``np.memmap``, so memory use does not grow with the take.
+A partial record at the end, from a take that was cut short, is ignored.
+"""
+import os
+
+import numpy as np
+
+from .landmarks import NUM_LANDMARKS, Hand
+
+MAGIC = b'MHLM'
+VERSION = 1
+HEADER_DTYPE = np.dtype([('magic', 'S4'), ('version', '<u2'), ('max_hands', '<u2')])
+HANDEDNESS = ('Unknown', 'Left', 'Right')
+
+
+def record_dtype(max_hands):
+    return np.dtype([
+        ('time', '<f8'),
+        ('count', 'u1'),
+        ('handedness', 'u1', (max_hands,)),
+        ('score', '<f4', (max_hands,)),
+        ('landmarks', '<f4', (max_hands, NUM_LANDMARKS, 3)),
+    ])
+
+
+class LandmarkRecorder:
+    def __init__(self, path, max_hands=2):
+        self.path = path
+        self.max_hands = max_hands
+        self.frames = 0
+        self._start = None
+        self._record = np.zeros(1, dtype=record_dtype(max_hands))
+        self._file = open(path, 'wb')
+        header = np.array([(MAGIC, VERSION, max_hands)], dtype=HEADER_DTYPE)
+        header.tofile(self._file)
+
+    def write(self, timestamp, hands):
+        if self._start is None:
+            self._start = timestamp
+        record = self._record[0]
+        count = min(len(hands), self.max_hands)
+        record['time'] = timestamp - self._start
+        record['count'] = count
+        for i in range(count):
+            hand = hands[i]
+            record['handedness'][i] = HANDEDNESS.index(hand.handedness) if hand.handedness in HANDEDNESS else 0
+            record['score'][i] = hand.score
+            record['landmarks'][i] = hand.landmarks
+        self._record.tofile(self._file)
+        self.frames += 1
+
+    def close(self):
+        self._file.close()
+
+
+class LandmarkRecording:
+    def __init__(self, path):
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if len(header) != 1 or header[0]['magic'] != MAGIC:
+            raise ValueError(f"{path} is not a landmark recording")
+        if header[0]['version'] != VERSION:
+            raise ValueError(f"{path} has unsupported recording version {header[0]['version']}")
+        self.path = path
+        self.max_hands = int(header[0]['max_hands'])
+        dtype = record_dtype(self.max_hands)
+        # A take cut short by a crash ends in a partial record, which is left out
+        count, self.trailing_bytes = divmod(os.path.getsize(path) - HEADER_DTYPE.itemsize, dtype.itemsize)
+        if count:
+            self.records = np.memmap(path, dtype=dtype, mode='r', offset=HEADER_DTYPE.itemsize, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def duration(self):
+        return float(self.records['time'][-1] - self.records['time'][0]) if len(self.records) else 0.0
+
+    def frames(self):
+        """Yield ``(time, hands)`` per frame; landmark arrays are read-only views into the file."""
+        for record in self.records:
+            hands = [Hand(record['landmarks'][i], HANDEDNESS[record['handedness'][i]], float(record['score'][i]))
+                     for i in range(record['count'])]
+            yield float(record['time']), hands
+
@@ -0,0 +1,111 @@
+"""Region-of-interest hand tracking with a capped inference resolution."""
+import cv2
+import numpy as np
+
+from .landmarks import Hand, hands_from_results
+
+
+class RoiTracker:
+    """Runs a video-mode ``mp.solutions.hands.Hands`` model on a padded crop around the last known hands.
+
+    Crops (and full frames while searching) are downscaled so their width is at most
+    ``inference_width`` before inference, and the landmarks are mapped back to
+    normalized full-frame coordinates. When no hand is found the next frame is searched
+    in full, and every ``redetect_interval`` frames a full search looks for hands that
+    entered outside the region.
+
+    The model tracks each hand from its previous landmarks, in the coordinates of the
+    previous input, which skips the palm detector. So the crop is held still while the
+    hands stay more than ``margin`` (a fraction of its size) inside its edges, and
+    whenever the window does move, or switches to or from the full frame, the model is
+    reset rather than left tracking from a rectangle that now points elsewhere.
+    ``hands_model`` must not be shared with anything else.
+    """
+
+    def __init__(self, hands_model, inference_width=640, padding=0.5, margin=0.15, min_size=0.15,
+                 max_num_hands=2, redetect_interval=30):
+        self.hands_model = hands_model
+        self.inference_width = inference_width
+        self.padding = padding
+        self.margin = margin
+        self.min_size = min_size
+        self.max_num_hands = max_num_hands
+        self.redetect_interval = redetect_interval
+        self.roi = None
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.resets = 0
+        self._window = None
+        self._since_search = 0
+        self._buffer = None
+
+    def _prepare(self, crop):
+        h, w = crop.shape[:2]
+        if w <= self.inference_width:
+            return np.ascontiguousarray(crop)
+        size = (self.inference_width, max(1, round(h * self.inference_width / w)))
+        if self._buffer is None or self._buffer.shape[1::-1] != size:
+            self._buffer = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        return cv2.resize(crop, size, dst=self._buffer, interpolation=cv2.INTER_LINEAR)
+
+    def _update_roi(self, hands, width, height):
+        if not hands:
+            self.roi = None
+            return
+        if len(hands) < self.max_num_hands and self._since_search >= self.redetect_interval:
+            self.roi = None
+            return
+
+        points = np.concatenate([hand.landmarks[:, :2] for hand in hands]) * (width, height)
+        x0, y0 = points.min(axis=0)
+        x1, y1 = points.max(axis=0)
+        # Keep the current crop while the hands are well inside it and still fill a fair part of it
+        if self.roi is not None:
+            left, top, right, bottom = self.roi
+            inset = self.margin * min(right - left, bottom - top)
+            inside = (x0 >= left + inset or left == 0) and (y0 >= top + inset or top == 0) \
+                and (x1 <= right - inset or right == width) and (y1 <= bottom - inset or bottom == height)
+            if inside and max(x1 - x0, y1 - y0) * (1 + 2 * self.padding) * 2 > min(right - left, bottom - top):
+                return
+        # Pad a square around the hands, in pixels, so they can move for a while before it has to
+        size = max(x1 - x0, y1 - y0, self.min_size * min(width, height))
+        size *= 1 + 2 * self.padding
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+        left, top = int(max(0, cx - size / 2)), int(max(0, cy - size / 2))
+        right, bottom = int(min(width, cx + size / 2)), int(min(height, cy + size / 2))
+        self.roi = (left, top, right, bottom) if right > left and bottom > top else None
+
+    def process(self, rgb):
+        """Return the ``Hand`` list for an RGB frame, in full-frame normalized coordinates."""
+        height, width = rgb.shape[:2]
+        if self.roi is None:
+            left, top, right, bottom = 0, 0, width, height
+            self.full_frames += 1
+            self._since_search = 0
+        else:
+            left, top, right, bottom = self.roi
+            self.roi_frames += 1
+            self._since_search += 1
+        window = (left, top, right, bottom)
+        if window != self._window:
+            if self._window is not None:
+                self.hands_model.reset()
+                self.resets += 1
+            self._window = window
+
+        results = self.hands_model.process(self._prepare(rgb[top:bottom, left:right]))
+        hands = hands_from_results(results)
+
+        crop_width, crop_height = right - left, bottom - top
+        if crop_width != width or crop_height != height:
+            mapped = []
+            for hand in hands:
+                landmarks = hand.landmarks
+                landmarks[:, 0] = (left + landmarks[:, 0] * crop_width) / width
+                landmarks[:, 1] = (top + landmarks[:, 1] * crop_height) / height
+                landmarks[:, 2] *= crop_width / width
+                mapped.append(Hand(landmarks, hand.handedness, hand.score))
+            hands = mapped
+
+        self._update_roi(hands, width, height)
+        return hands
@@ -0,0 +1,287 @@
+"""Frame sources behind one open/read/close interface: cameras, video files, image sequences and generated frames."""
+import glob
+import os
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+IMAGE_PATTERNS = ('*.png', '*.jpg', '*.jpeg', '*.bmp')
+
+# Capture API per backend name; 'any' lets OpenCV pick
+BACKENDS = {
+    'any': cv2.CAP_ANY,
+    'dshow': cv2.CAP_DSHOW,
+    'msmf': cv2.CAP_MSMF,
+    'v4l2': cv2.CAP_V4L2,
+    'avfoundation': cv2.CAP_AVFOUNDATION,
+}
+
+
+@dataclass(frozen=True)
+class CaptureFormat:
+    """A requested or granted capture format; ``None`` leaves a property to the driver."""
+    width: int = None
+    height: int = None
+    fps: float = None
+    fourcc: str = None  # Pixel format such as 'MJPG' or 'YUYV'
+    buffer_size: int = None  # Frames the driver queues; 1 keeps only the newest
+    backend: str = None  # A name from BACKENDS
+
+    def describe(self):
+        size = f"{self.width}x{self.height}" if self.width and self.height else "default size"
+        fps = f"{self.fps:g} fps" if self.fps else "default fps"
+        parts = [size, fps, self.fourcc or "default format"]
+        if self.buffer_size:
+            parts.append(f"buffer {self.buffer_size}")
+        if self.backend:
+            parts.append(f"via {self.backend}")
+        return ", ".join(parts)
+
+
+def fourcc_text(code):
+    code = int(code)
+    text = ''.join(chr((code >> shift) & 0xFF) for shift in (0, 8, 16, 24))
+    return text if code and text.isprintable() else None
+
+
+def parse_size(text):
+    """``'1280x720'`` -> ``(1280, 720)``."""
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+
+class FrameSource:
+    """Common interface of the frame sources.
+
+    ``open()`` returns False if the source cannot be used. ``read()`` returns the next BGR
+    frame, or None on a failed read; on a ``finite`` source that is the end. ``granted``
+    is the ``CaptureFormat`` actually delivered, known once the source is open. ``live``
+    sources are paced by the device; the others are paced to ``granted.fps`` when they
+    stand in for a camera.
+    """
+
+    finite = True
+    live = False
+    granted = CaptureFormat()
+
+    def open(self):
+        raise NotImplementedError
+
+    def read(self):
+        raise NotImplementedError
+
+    def mismatches(self):
+        return []
+
+    def close(self):
+        pass
+
+    def __iter__(self):
+        while True:
+            image = self.read()
+            if image is None:
+                if self.finite:
+                    return
+                continue
+            yield image
+
+
+class CameraSource(FrameSource):
+    """A camera, opened with the ``requested`` format and read back to see what was granted.
+
+    The pixel format is set first: many webcams only offer high resolutions at high
+    frame rates as MJPG and otherwise fall back to uncompressed YUYV at a lower rate.
+    Some drivers only apply a format with the first frame, so one frame is read during
+    ``open`` and its size is taken as the granted resolution; it is returned by the first
+    ``read``.
+    """
+
+    finite = False
+    live = True
+
+    def __init__(self, index, requested=CaptureFormat()):
+        self.index = index
+        self.requested = requested
+        self.cap = None
+        self._first = None
+
+    def open(self):
+        requested = self.requested
+        api = BACKENDS[requested.backend or 'any']
+        self.cap = cv2.VideoCapture(self.index, api)
+        if not self.cap.isOpened():
+            return False
+
+        if requested.fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*requested.fourcc))
+        if requested.width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, requested.width)
+        if requested.height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, requested.height)
+        if requested.fps:
+            self.cap.set(cv2.CAP_PROP_FPS, requested.fps)
+        if requested.buffer_size:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, requested.buffer_size)
+
+        success, image = self.cap.read()
+        self._first = image if success else None
+        if success:
+            height, width = image.shape[:2]
+        else:
+            width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        try:
+            backend = self.cap.getBackendName().lower()
+        except cv2.error:
+            backend = requested.backend
+        self.granted = CaptureFormat(
+            width=width or None,
+            height=height or None,
+            fps=self.cap.get(cv2.CAP_PROP_FPS) or None,
+            fourcc=fourcc_text(self.cap.get(cv2.CAP_PROP_FOURCC)),
+            # 0 means the backend does not expose the queue depth
+            buffer_size=int(self.cap.get(cv2.CAP_PROP_BUFFERSIZE)) or None,
+            backend=backend,
+        )
+        return True
+
+    def mismatches(self):
+        """``(property, requested, granted)`` for each requested property the device did not grant."""
+        requested, granted = self.requested, self.granted
+        found = []
+        for name in ('width', 'height', 'buffer_size'):
+            if getattr(requested, name) and getattr(requested, name) != getattr(granted, name):
+                found.append((name, getattr(requested, name), getattr(granted, name)))
+        if requested.fps and abs(requested.fps - (granted.fps or 0)) > 0.5:
+            found.append(('fps', requested.fps, granted.fps))
+        if requested.fourcc and requested.fourcc.upper() != (granted.fourcc or '').upper():
+            found.append(('fourcc', requested.fourcc, granted.fourcc))
+        if requested.backend and requested.backend != 'any' and requested.backend != granted.backend:
+            found.append(('backend', requested.backend, granted.backend))
+        return found
+
+    def read(self):
+        if self._first is not None:
+            image, self._first = self._first, None
+            return image
+        success, image = self.cap.read()
+        return image if success else None
+
+    def close(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class VideoFileSource(FrameSource):
+    """A video file (or stream URL) decoded frame by frame."""
+
+    def __init__(self, path):
+        self.path = path
+        self.cap = None
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            return False
+        self.granted = CaptureFormat(
+            width=int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or None,
+            height=int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or None,
+            fps=self.cap.get(cv2.CAP_PROP_FPS) or None,
+            fourcc=fourcc_text(self.cap.get(cv2.CAP_PROP_FOURCC)),
+        )
+        return True
+
+    def read(self):
+        success, image = self.cap.read()
+        return image if success else None
+
+    def close(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class ImageSequenceSource(FrameSource):
+    """The images in a directory, in name order, as frames ``1 / fps`` apart."""
+
+    def __init__(self, directory, fps=30.0):
+        self.directory = directory
+        self.fps = fps
+        self._paths = []
+
+    def open(self):
+        self._paths = sorted(p for pattern in IMAGE_PATTERNS for p in glob.glob(os.path.join(self.directory, pattern)))
+        image = cv2.imread(self._paths[0]) if self._paths else None
+        if image is None:
+            return False
+        height, width = image.shape[:2]
+        self.granted = CaptureFormat(width=width, height=height, fps=self.fps)
+        self._paths.reverse()
+        return True
+
+    def read(self):
+        while self._paths:
+            image = cv2.imread(self._paths.pop())
+            if image is not None:
+                return image
+        return None
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames: a still, noisy scene with a bright block sweeping across it.
+
+    Stands in for a camera when benchmarking the pipeline without hardware. ``frames``
+    limits the length; by default it runs until closed. Noise is drawn once for a few
+    frames and cycled, so generating a frame costs little more than a copy.
+    """
+
+    def __init__(self, width=640, height=360, fps=30.0, frames=None, seed=0):
+        self.frames = frames
+        self.finite = frames is not None
+        self.granted = CaptureFormat(width=width, height=height, fps=fps, fourcc='BGR3')
+        self._seed = seed
+        self._noise = None
+        self.count = 0
+
+    def open(self):
+        width, height = self.granted.width, self.granted.height
+        rng = np.random.default_rng(self._seed)
+        background = rng.integers(60, 120, (height, width, 3), dtype=np.uint8)
+        self._noise = [background + rng.integers(0, 4, (height, width, 3), dtype=np.uint8) for _ in range(4)]
+        self.count = 0
+        return True
+
+    def read(self):
+        if self.finite and self.count >= self.frames:
+            return None
+        width, height = self.granted.width, self.granted.height
+        image = self._noise[self.count % len(self._noise)].copy()
+        # One sweep every two seconds
+        block = max(height // 3, 1)
+        period = max(int(2 * self.granted.fps), 1)
+        x = (self.count % period) * (width - block) // period
+        image[height // 3:height // 3 + block, x:x + block] = 230
+        self.count += 1
+        return image
+
+
+def create_source(spec, requested=CaptureFormat(), fps=30.0):
+    """A source for a camera index, ``'synthetic[:WxH[@FPS]]'``, an image directory or a video path.
+
+    ``requested`` applies to cameras; ``fps`` is the frame rate of image sequences.
+    """
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(int(spec), requested)
+    if spec.startswith('synthetic'):
+        width, height, rate = 640, 360, fps
+        options = spec.partition(':')[2]
+        if options:
+            size, _, rate_text = options.partition('@')
+            width, height = parse_size(size)
+            rate = float(rate_text) if rate_text else fps
+        return SyntheticSource(width, height, rate)
+    if os.path.isdir(spec):
+        return ImageSequenceSource(spec, fps)
+    return VideoFileSource(spec)
@@ -0,0 +1,22 @@
+"""Accumulated wall-clock time per pipeline stage."""
+import time
+
+
+class StageTimer:
+    def __init__(self):
+        self.totals = {}
+        self.counts = {}
+
+    def add(self, stage, start):
+        """Account the time since ``start`` (a ``time.perf_counter()`` value) to ``stage``."""
+        elapsed = time.perf_counter() - start
+        self.totals[stage] = self.totals.get(stage, 0.0) + elapsed
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+        return elapsed
+
+    def report(self, frames, elapsed):
+        lines = [f"{frames} frames in {elapsed:.2f} s ({frames / elapsed if elapsed else 0.0:.1f} fps)"]
+        for stage, total in self.totals.items():
+            lines.append(f"  {stage:<12} {total / self.counts[stage] * 1000:8.3f} ms/call  "
+                         f"{total / elapsed * 100 if elapsed else 0.0:5.1f}% of wall time")
+        return "\n".join(lines)
@@ -0,0 +1,61 @@
+"""Per-hand voice state for polyphonic playing."""
+import numpy as np
+
+FREE = 0
+UNKNOWN = 3
+HANDEDNESS_KEYS = {'Left': 1, 'Right': 2}
+
+
+class VoiceTable:
+    """Fixed-size arrays holding one voice per tracked hand.
+
+    Hands are matched to voices by handedness; hands MediaPipe could not label are
+    matched to the nearest unlabelled voice by wrist position. A voice keeps its slot
+    while its note is still sounding, so a hand that drops out for a frame or two
+    comes back to the same voice.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.key = np.zeros(size, dtype=np.int8)
+        self.seen = np.zeros(size, dtype=bool)
+        self.note = np.full(size, -1, dtype=np.int16)
+        self.zone = np.full(size, -1, dtype=np.int16)  # NoteMap zone of the sounding note
+        self.gesture = np.full(size, -1, dtype=np.int8)  # GestureClassifier index of the last gesture, -1 for none
+        self.last_time = np.zeros(size, dtype=np.float64)
+        self.wrist = np.zeros((size, 2), dtype=np.float32)
+
+    def assign(self, hands):
+        """Mark the voices of this frame's hands as seen; returns a slot per hand, -1 if the table is full."""
+        self.seen[:] = False
+        slots = []
+        for hand in hands:
+            key = HANDEDNESS_KEYS.get(hand.handedness, UNKNOWN)
+            wrist = hand.landmarks[0, :2]
+            slot = self._find(key, wrist)
+            if slot >= 0:
+                self.key[slot] = key
+                self.seen[slot] = True
+                self.wrist[slot] = wrist
+            slots.append(slot)
+        return slots
+
+    def _find(self, key, wrist):
+        candidates = (self.key == key) & ~self.seen
+        if candidates.any():
+            if key != UNKNOWN:
+                return int(np.argmax(candidates))
+            distances = np.where(candidates, np.sum((self.wrist - wrist) ** 2, axis=1), np.inf)
+            return int(np.argmin(distances))
+        free = self.key == FREE
+        return int(np.argmax(free)) if free.any() else -1
+
+    def free(self, slot):
+        self.key[slot] = FREE
+        self.seen[slot] = False
+        self.note[slot] = -1
+        self.zone[slot] = -1
+        self.gesture[slot] = -1
+
+    def active(self):
+        return np.flatnonzero(self.key != FREE)
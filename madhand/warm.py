@@ -0,0 +1,62 @@
+"""Long-lived pipeline resources, built once in the background and reused across runs."""
+import threading
+import time
+
+
+class WarmEngine:
+    """Caches MediaPipe Hands models (one per ``max_num_hands``) and the open MIDI port.
+
+    ``prewarm`` is meant to be called from a background thread at startup: it pays for
+    the heavy imports, the graph construction and the first, slowest inference before
+    the user presses RUN.
+    """
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+        self._port = None
+        self._port_name = None
+
+    def prewarm(self, max_num_hands=2):
+        """Build and exercise a model; returns the seconds it took."""
+        import numpy as np
+
+        start = time.perf_counter()
+        # Held throughout, so a run asking for the same model waits rather than sharing it mid-inference
+        with self._lock:
+            self._model(max_num_hands).process(np.zeros((360, 640, 3), dtype=np.uint8))
+        return time.perf_counter() - start
+
+    def hands(self, max_num_hands):
+        with self._lock:
+            return self._model(max_num_hands)
+
+    def _model(self, max_num_hands):
+        model = self._models.get(max_num_hands)
+        if model is None:
+            import mediapipe as mp
+            model = mp.solutions.hands.Hands(max_num_hands=max_num_hands,
+                                             min_detection_confidence=0.7, min_tracking_confidence=0.7)
+            self._models[max_num_hands] = model
+        return model
+
+    def midi_port(self, name):
+        """Return an open output port called ``name``, reusing the last one if it matches."""
+        import mido
+
+        if self._port is not None and self._port_name != name:
+            self._port.close()
+            self._port = None
+        if self._port is None:
+            self._port = mido.open_output(name)
+            self._port_name = name
+        return self._port
+
+    def close(self):
+        with self._lock:
+            for model in self._models.values():
+                model.close()
+            self._models.clear()
+        if self._port is not None:
+            self._port.close()
+            self._port = None